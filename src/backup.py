@@ -1,5 +1,7 @@
 import logging
+import os
 import shutil
+import zipfile
 from datetime import datetime
 from pathlib import Path
 
@@ -8,27 +10,40 @@ class RemoteBackuper:
     Handles the archiving and copying of experiment artifacts to a
     remote destination, like a mounted Google Drive, using pathlib.
     """
-    def __init__(self, destination_dir: str | Path):
+    def __init__(self, destination_dir: str | Path, compression: int = zipfile.ZIP_STORED, compresslevel: int | None = None):
         """
         Initializes the backuper with the remote destination path.
+
+        Args:
+            destination_dir: Directory that receives the backups.
+            compression: zipfile compression method for directory archives. Defaults to
+                ZIP_STORED since most artifacts (models, archives) are incompressible;
+                pass ZIP_DEFLATED with compresslevel=1 for text-heavy trees such as logs.
+            compresslevel: Optional compression level passed through to zipfile.
         """
         # Ensure the destination is a Path object
         self.destination_dir = Path(destination_dir)
         self.destination_dir.mkdir(parents=True, exist_ok=True)
+        # Plain-string form for the internal os.path helpers (avoids building Path objects per call)
+        self._dest_str = os.fspath(self.destination_dir)
+        self.compression = compression
+        self.compresslevel = compresslevel
         logging.info(f"RemoteBackuper initialized. Destination: '{self.destination_dir}'")
 
     def backup_file(self, source_path: str | Path):
         """
         Copies a single file to the destination directory.
         """
-        source = Path(source_path)
-        if not source.exists():
+        source = os.fspath(source_path)
+        if not os.path.exists(source):
             logging.error(f"Backup failed: Source file not found at '{source}'")
             return
 
         try:
-            destination_path = self.destination_dir / source.name
+            destination_path = os.path.join(self._dest_str, os.path.basename(source))
             logging.info(f"Copying '{source}' to '{destination_path}'...")
+            # copyfile already copies in-kernel (sendfile) on Linux, falls back to a read/write loop
+            # where sendfile fails (e.g. FUSE mounts), and refuses to copy a file onto itself
             shutil.copyfile(source, destination_path)
             logging.info("✅ File backup successful.")
         except Exception as e:
@@ -36,43 +51,49 @@ class RemoteBackuper:
 
     def backup_directory_as_zip(self, source_dir: str | Path, archive_name_prefix: str):
         """
-        Creates a timestamped zip archive of a source directory and copies
-        it to the destination.
+        Creates a timestamped zip archive of a source directory, writing it
+        directly to the destination (no local temp archive).
         """
-        source = Path(source_dir)
-        if not source.is_dir():
+        source = os.fspath(source_dir)
+        if not os.path.isdir(source):
             logging.error(f"Backup failed: Source directory not found at '{source}'")
             return
 
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        archive_name = f"{archive_name_prefix}_{timestamp}"
+        destination_zip_path = os.path.join(self._dest_str, f"{archive_name}.zip")
+
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            archive_name = f"{archive_name_prefix}_{timestamp}"
-            
             logging.info(f"Creating archive '{archive_name}.zip' from '{source}'...")
-            
-            # Create the zip file locally first
-            archive_path_str = shutil.make_archive(
-                base_name=archive_name,
-                format='zip',
-                root_dir=source
-            )
-            #archive_path_str = shutil.make_archive(
-                #base_name=archive_name,
-                #format='zip',
-                #root_dir=source.parent,
-                #base_dir=source.name
-            #)
-            
-            # Convert the returned string path to a Path object
-            local_archive_path = Path(archive_path_str)
 
-            # Copy the final zip file to the remote destination
-            destination_zip_path = self.destination_dir / local_archive_path.name
-            shutil.copyfile(local_archive_path, destination_zip_path)
-            
-            # Clean up the local zip file after copying
-            local_archive_path.unlink()
-            
+            with zipfile.ZipFile(
+                destination_zip_path,
+                'w',
+                compression=self.compression,
+                compresslevel=self.compresslevel,
+                allowZip64=True
+            ) as zf:
+                _write_tree(zf, source, "")
+
             logging.info(f"✅ Directory backup successful. Archive saved to '{destination_zip_path}'")
         except Exception as e:
+            # Don't leave a truncated archive behind at the destination
+            if os.path.exists(destination_zip_path):
+                os.remove(destination_zip_path)
             logging.error(f"❌ Error during directory backup: {e}")
+
+
+def _write_tree(zf: zipfile.ZipFile, dir_path: str, arc_prefix: str):
+    """Recursively adds the contents of dir_path to zf, with names relative to the archive root."""
+    with os.scandir(dir_path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        arcname = arc_prefix + entry.name
+        is_dir = entry.is_dir(follow_symlinks=False)
+        if not (is_dir or entry.is_file()):
+            # Broken symlinks, symlinked directories, FIFOs, sockets...: zf.write would fail or block on them
+            logging.debug(f"Skipping non-regular entry '{entry.path}'")
+            continue
+        zf.write(entry.path, arcname=arcname)
+        if is_dir:
+            _write_tree(zf, entry.path, arcname + "/")
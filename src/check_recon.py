@@ -1,4 +1,10 @@
+import mmap
+import os
 import sys
+from functools import cache
+from typing import Callable
+import orjson
+from pydantic import TypeAdapter
 from config_loader import load_config
 from data_loaders import get_data_loader
 from exceptions import UserFacingError
@@ -7,6 +13,8 @@ from evaluation import ReconstructionEvaluator
 from data_models import CaptionedVideo
 from evaluation import round_metrics
 
+_RECON_ADAPTER = TypeAdapter(Reconstructed)
+
 
 def str_ts(ts:float) -> str:
     hours = int(ts//3600)
@@ -17,42 +25,93 @@ def str_ts(ts:float) -> str:
     return f"{minutes:02d}:{seconds:02d}"
 
 def ls_recon(path):
-    with open(path, 'r') as f:
+    with open(path, 'rb') as f:
         i = 1
         for line in f:
-            r = Reconstructed.model_validate_json(line)
+            r = _RECON_ADAPTER.validate_python(orjson.loads(line))
             print(f"{i}. {r.video_id} {r.metrics or 'FAIL'} {list(r.reconstructed_clips.keys())}")
             i += 1
 
+def _line_bounds(mm, pos: int) -> tuple[int, int]:
+    """Returns the [start, end) byte offsets of the line containing pos."""
+    start = mm.rfind(b'\n', 0, pos) + 1
+    end = mm.find(b'\n', pos)
+    return start, (len(mm) if end == -1 else end)
+
+def _find_line_by_index(mm, index: int) -> tuple[int, int] | None:
+    if index < 1:  # indices are 1-based
+        return None
+    start = 0
+    for _ in range(index - 1):
+        nl = mm.find(b'\n', start)
+        if nl == -1:
+            return None
+        start = nl + 1
+    if start >= len(mm):
+        return None
+    return _line_bounds(mm, start)
+
+def _find_line_by_video_id(mm, video_id: str) -> tuple[int, int] | None:
+    # Recon lines are written by model_dump_json, so video_id is the first key: {"video_id":"..."
+    needle = b'{"video_id":' + orjson.dumps(video_id)
+    pos = mm.find(needle)
+    while pos != -1:
+        if pos == 0 or mm[pos - 1] == ord('\n'):
+            return _line_bounds(mm, pos)
+        pos = mm.find(needle, pos + 1)
+    return None
+
 def load_recon(path, index=None, video_id=None):
+    """
+    Finds a single record in a recon JSONL file by 1-based index or video_id.
+    The file is memory-mapped and only the matching line is parsed.
+    """
     if index is None and not video_id:
         raise Exception('need index or video_id')
-    with open(path, 'r') as f:
-        i = 1
-        for line in f:
-            r = Reconstructed.model_validate_json(line)
-            if i==index or r.video_id==video_id:
-                return r, i
-            i += 1
-    raise Exception('not found')
-
-def build_evaluators(sentences:list[str]):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise Exception('not found')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if index is not None:
+                bounds = _find_line_by_index(mm, index)
+            else:
+                bounds = _find_line_by_video_id(mm, video_id)
+            if bounds is None:
+                raise Exception('not found')
+            start, end = bounds
+            r = _RECON_ADAPTER.validate_python(orjson.loads(mm[start:end]))
+            i = index if index is not None else mm[:start].count(b'\n') + 1
+            return r, i
+
+EvalKey = tuple[str, bool, bool]  # (model_type, idf, rescale_with_baseline)
+EvalFactory = Callable[[], ReconstructionEvaluator]
+
+def _evaluator_factory(model_type: str, idf: bool, rescale: bool, sentences: list[str]) -> EvalFactory:
+    """Returns a memoized thunk, so the (large) scorer model is only loaded if it is actually used."""
+    @cache
+    def build() -> ReconstructionEvaluator:
+        evaluator = ReconstructionEvaluator(model_type=model_type, idf=idf, rescale_with_baseline=rescale)
+        return evaluator.calc_idf(sentences) if idf else evaluator
+    return build
+
+def build_evaluators(sentences:list[str]) -> dict[EvalKey, EvalFactory]:
     eval_models = [
         'microsoft/deberta-large-mnli', # current
         "roberta-large", # BS default
         'microsoft/deberta-v2-xlarge-mnli',
         'distilbert-base-uncased'
     ]
+    rescale = False
     d = {}
     for m in eval_models:
-        p = {'model_type':m, 'idf':False, 'rescale_with_baseline': False}
-        d[str(p)] = ReconstructionEvaluator(**p)
-        p = {'model_type':m, 'idf':True, 'rescale_with_baseline': False}
-        d[str(p)] = ReconstructionEvaluator(**p).calc_idf(sentences)
+        for idf in (False, True):
+            d[(m, idf, rescale)] = _evaluator_factory(m, idf, rescale, sentences)
     return d
 
 def pretty_compare(original_video, reconstructed_data, tab=True):
-    j = 0
+    metrics = reconstructed_data.metrics
+    # Scores are stored in reconstructed-clip order, so walk them with a single iterator
+    metric_iter = zip(metrics['bs_f1'], metrics['bs_p'], metrics['bs_r'])
     for i, original_clip in enumerate(original_video.clips):
         original_desc = original_clip.data.caption
         ts = f"[{str_ts(original_clip.timestamp.start)} - {str_ts(original_clip.timestamp.end)}]"
@@ -69,10 +128,7 @@ def pretty_compare(original_video, reconstructed_data, tab=True):
         recon_desc = recon_clip.data.caption
 
         # Format the metrics for this specific clip
-        f1 = reconstructed_data.metrics.get('bs_f1')[j]
-        p = reconstructed_data.metrics.get('bs_p')[j]
-        r = reconstructed_data.metrics.get('bs_r')[j]
-        j += 1
+        f1, p, r = next(metric_iter)
         metrics_str = f"F1={f1:.3f} P={p:.3f} R={r:.3f}"
 
         if not tab:
@@ -85,11 +141,12 @@ def pretty_compare(original_video, reconstructed_data, tab=True):
             print(f'   \t{metrics_str}\t  ')
 
 
-def do_eval(evals:dict[str, ReconstructionEvaluator], original_video: CaptionedVideo, reconstructed_data: Reconstructed):
+def do_eval(evals:dict[EvalKey, EvalFactory], original_video: CaptionedVideo, reconstructed_data: Reconstructed):
     print(f'{original_video.video_id=} size={len(original_video.clips)} masked={len(reconstructed_data.reconstructed_clips)}')
+    # The alignment doesn't depend on the evaluator, so compute it once
+    candidates, references = reconstructed_data.align(original_video.clips)
     for k,v in evals.items():
-        candidates, references = reconstructed_data.align(original_video.clips)
-        metrics = round_metrics(v.evaluate(reconstructed_data, original_video), 3)
+        metrics = round_metrics(v().evaluate(reconstructed_data, original_video), 3)
         bs_f1 = metrics['bs_f1']
         bs_p = metrics['bs_p']
         bs_r = metrics['bs_r']
@@ -109,7 +166,7 @@ from rich.table import Table
 
 
 def do_eval_to_dataframe(
-        evals: dict[str, ReconstructionEvaluator],
+        evals: dict[EvalKey, EvalFactory],
         original_video: CaptionedVideo,
         reconstructed_data: Reconstructed
 ):
@@ -117,80 +174,69 @@ def do_eval_to_dataframe(
     Runs evaluation and returns a styled pandas DataFrame with results,
     including ranked scores.
     """
-    all_results = []
+    score_cols = ("F1", "P", "R")
+    metric_keys = ("bs_f1", "bs_p", "bs_r")
+    columns: dict[str, list] = {k: [] for k in ("eval_params", "sent_ind", "orig_sent", "recon_sent", *score_cols)}
 
-    # --- 1. Gather data for all evaluators ---
-    for eval_name, evaluator in evals.items():
-        candidates, references = reconstructed_data.align(original_video.clips)
+    # The alignment doesn't depend on the evaluator, so compute it once
+    candidates, references = reconstructed_data.align(original_video.clips)
+    n = len(candidates)
 
-        # We assume evaluate() returns raw PyTorch tensors
-        metrics = evaluator.evaluate(reconstructed_data, original_video)
+    # --- 1. Gather data for all evaluators (column-wise) ---
+    for eval_name, get_evaluator in evals.items():
 
-        # Extract the score tensors
-        bs_f1 = metrics.get('bs_f1', [])
-        bs_p = metrics.get('bs_p', [])
-        bs_r = metrics.get('bs_r', [])
+        # We assume evaluate() returns raw PyTorch tensors
+        metrics = get_evaluator().evaluate(reconstructed_data, original_video)
 
-        for i in range(len(candidates)):
-            all_results.append({
-                "eval_params": eval_name,
-                "sent_ind": i,
-                "orig_sent": references[i],
-                "recon_sent": candidates[i],
-                "F1": bs_f1[i].item() if hasattr(bs_f1, '__len__') and i < len(bs_f1) else None,
-                "P": bs_p[i].item() if hasattr(bs_p, '__len__') and i < len(bs_p) else None,
-                "R": bs_r[i].item() if hasattr(bs_r, '__len__') and i < len(bs_r) else None,
-            })
+        columns["eval_params"].extend([eval_name] * n)
+        columns["sent_ind"].extend(range(n))
+        columns["orig_sent"].extend(references)
+        columns["recon_sent"].extend(candidates)
+        for col, key in zip(score_cols, metric_keys):
+            # One device->host transfer per tensor instead of one .item() per clip
+            scores = metrics[key].detach().cpu().tolist() if key in metrics else []
+            columns[col].extend(scores[:n] + [None] * (n - len(scores)))
 
     # --- 2. Build and process the DataFrame ---
-    if not all_results:
+    if not columns["eval_params"]:
         print("No evaluation results to display.")
         return
 
-    df = pd.DataFrame(all_results)
+    df = pd.DataFrame(columns)
 
     # --- 3. Calculate Rank Columns ---
     # The 'rank' method in pandas with method='first' handles ties gracefully
-    df['F1_rank'] = df.groupby('eval_params')['F1'].rank(method='first', ascending=False) - 1
-    df['P_rank'] = df.groupby('eval_params')['P'].rank(method='first', ascending=False) - 1
-    df['R_rank'] = df.groupby('eval_params')['R'].rank(method='first', ascending=False) - 1
+    rank_cols = [f"{c}_rank" for c in score_cols]
+    by_eval = df.groupby('eval_params')
+    for col, rank_col in zip(score_cols, rank_cols):
+        df[rank_col] = by_eval[col].rank(method='first', ascending=False) - 1
 
     # Convert ranks to integers
-    df[['F1_rank', 'P_rank', 'R_rank']] = df[['F1_rank', 'P_rank', 'R_rank']].astype(int)
+    df[rank_cols] = df[rank_cols].astype(int)
 
     # --- 4. Pretty-print the final table ---
     console = Console()
     table = Table(title=f"Qualitative Analysis for Video: {original_video.video_id}", show_lines=True)
 
     # Define the columns to display
-    display_cols = ["eval_params", "sent_ind", "F1_rank", "P_rank", "R_rank", "F1", "P", "R", "orig_sent", "recon_sent"]
+    display_cols = ["eval_params", "sent_ind", *rank_cols, *score_cols, "orig_sent", "recon_sent"]
 
     for col in display_cols:
         table.add_column(col)
 
-    # Format and add rows
-    for _, row in df.iterrows():
-        # Format floats to 2 decimal places for cleaner output
-        f1_str = f"{row['F1']:.3f}" if pd.notna(row['F1']) else "N/A"
-        p_str = f"{row['P']:.3f}" if pd.notna(row['P']) else "N/A"
-        r_str = f"{row['R']:.3f}" if pd.notna(row['R']) else "N/A"
-
-        table.add_row(
-            row['eval_params'],
-            str(row['sent_ind']),
-            str(row['F1_rank']),
-            str(row['P_rank']),
-            str(row['R_rank']),
-            f1_str,
-            p_str,
-            r_str,
-            f"{row['orig_sent']}",
-            f"{row['recon_sent']}"
-        )
+    # Format all columns as strings up front, then add rows
+    formatted = df[display_cols].astype(str)
+    for col in score_cols:
+        formatted[col] = df[col].map(lambda x: f"{x:.3f}" if pd.notna(x) else "N/A")
+
+    for row in formatted.itertuples(index=False, name=None):
+        table.add_row(*row)
 
     console.print(table)
 
-    df.to_csv(original_video.video_id+".csv")
+    # One orjson call per row, written as a single bytes blob (much cheaper than to_csv)
+    with open(original_video.video_id+".jsonl", 'wb') as f:
+        f.write(b"\n".join(orjson.dumps(r, option=orjson.OPT_SERIALIZE_NUMPY) for r in df.to_dict(orient='records')))
 
     return df  # Return the full DataFrame for further analysis
 
@@ -1,7 +1,27 @@
+import copy
+import os
 import yaml
 import logging
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as _SafeLoader  # libyaml-backed
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+@lru_cache(maxsize=32)
+def _load_yaml_cached(path: str, mtime_ns: int) -> dict:
+    # mtime_ns is part of the cache key so an edited file is re-read
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+def _load_yaml(path) -> dict:
+    path = os.fspath(path)
+    # Callers may mutate the returned config, so never hand out the cached object
+    return copy.deepcopy(_load_yaml_cached(path, os.stat(path).st_mtime_ns))
+
 def load_config(
     experiment_config_path,
     system_config_path="config/system.yaml"
@@ -11,12 +31,10 @@ def load_config(
     Experiment-specific configs will override system-level configs.
     """
     logging.info(f"Loading system config from: {system_config_path}")
-    with open(system_config_path, 'r') as f:
-        system_config = yaml.safe_load(f)
+    system_config = _load_yaml(system_config_path)
 
     logging.info(f"Loading experiment config from: {experiment_config_path}")
-    with open(experiment_config_path, 'r') as f:
-        experiment_config = yaml.safe_load(f)
+    experiment_config = _load_yaml(experiment_config_path)
     
     # Merge the two dictionaries
     merged_config = {**system_config, **experiment_config}
@@ -1,30 +1,131 @@
 import os
-import json
+import re
+import mmap
 import logging
+import orjson
+import ijson
+import itertools
+from collections.abc import Iterator
 from abc import ABC, abstractmethod
-from data_models import CaptionedClip, CaptionedVideo, NarrativeOnlyPayload, TimestampRange
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from pydantic import TypeAdapter
+from data_models import CaptionedVideo
 
+# Validates a whole list of raw video dicts in a single pydantic-core pass
+_VIDEO_LIST_ADAPTER = TypeAdapter(list[CaptionedVideo])
 
+
+def _read_json(path: str):
+    """
+    Decodes a whole JSON file with orjson straight from a read-only mmap,
+    so the page cache is parsed in place instead of copied into a bytes object.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(b"")  # raises the usual JSONDecodeError; mmap can't map empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+@lru_cache(maxsize=8192)
 def _parse_storytelling_timestamp(ts_str: str) -> float:
-    """Helper to parse MM:SS format into seconds."""
-    parts = ts_str.split(':')
-    minutes = int(parts[0])
-    seconds = int(parts[1])
-    return float(minutes * 60 + seconds)
+    """
+    Helper to parse MM:SS format into seconds.
+    Memoized: the same few thousand timestamp strings recur across the whole dataset.
+    """
+    minutes, _, rest = ts_str.partition(':')
+    seconds, _, _ = rest.partition(':')  # tolerate trailing junk such as "3:11:"
+    return float(int(minutes) * 60 + int(seconds))
+
+
+# One clip line: "<start> <end> <caption words...>"; lines with fewer than 3 fields don't match.
+# The caption group is greedy up to the line's last non-space char: a lazy `.*?` + `$` would
+# retry the end-of-line check after every character and made this regex ~3x slower.
+_STORYTELLING_LINE_RE = re.compile(r'^[^\S\n]*(\S+)[^\S\n]+(\S+)[^\S\n]+(\S(?:[^\n]*\S)?)', re.MULTILINE)
+
+# Any whitespace in a caption other than single plain spaces (tabs, NBSP, \x0b, \x0c, runs of spaces...)
+_UNNORMALIZED_SPACE_RE = re.compile(r'[^\S ]| {2}')
+
+def _storytelling_rows(body: str) -> list[tuple[str, str, str]]:
+    """Returns (start_str, end_str, caption) for every clip line in a storytelling file body."""
+    rows = _STORYTELLING_LINE_RE.findall(body)
+    for i, (start_str, end_str, caption) in enumerate(rows):
+        if _UNNORMALIZED_SPACE_RE.search(caption):
+            # normalize to single spaces, as " ".join(line.split()[2:]) did
+            rows[i] = (start_str, end_str, " ".join(caption.split()))
+    return rows
 
 
 class BaseDataLoader(ABC):
     """Abstract base class for all data loaders."""
-    @abstractmethod
+    limit: int|None = None
+    # Videos from the largest load so far; _cache_complete means it holds the whole dataset
+    _cache: list[CaptionedVideo]|None = None
+    _cache_complete: bool = False
+
     def load(self, limit:int|None=None) -> list[CaptionedVideo]:
-        """Loads data and returns a list of CaptionedVideo objects."""
+        """
+        Loads data and returns a list of CaptionedVideo objects.
+        Results are cached, so repeated calls (e.g. by find and the runners) only parse once.
+        """
+        _limit = limit or self.limit
+        if self._cache is not None and (self._cache_complete or (_limit and _limit <= len(self._cache))):
+            return self._cache[:_limit] if _limit else list(self._cache)
+
+        videos = self._load(_limit)
+        self._cache = videos
+        self._cache_complete = not _limit or len(videos) < _limit
+        return list(videos)
+
+    def reload(self):
+        """Drops cached videos (and the find() index) so the next load re-reads the dataset."""
+        self._cache = None
+        self._cache_complete = False
+        self.__dict__.pop('_index', None)
+
+    @abstractmethod
+    def _load(self, limit:int|None) -> list[CaptionedVideo]:
+        """Reads up to `limit` videos (all if None) from the underlying dataset."""
         pass
 
+    def load_iter(self) -> Iterator[CaptionedVideo]:
+        """
+        Yields the videos of the full dataset one at a time, without materializing them all.
+        Served from the cache when the whole dataset has already been loaded.
+        """
+        if self._cache_complete:
+            yield from self._cache
+        else:
+            yield from self._iter_videos()
+
+    def _iter_videos(self) -> Iterator[CaptionedVideo]:
+        """Streams videos from the underlying dataset. Subclasses override this to avoid a full load."""
+        yield from self._load(None)
+
+    def iter_sentences(self):
+        """
+        Yields every caption in the full dataset (ignoring any limit).
+        Subclasses override this to read captions without building pydantic models.
+        """
+        for video in self.load_iter():
+            for c in video.clips:
+                yield c.data.caption
+
     def load_all_sentences(self) -> list[str]:
-        return [c.data.caption for x in self.load(limit=10*1000*1000) for c in x.clips]
+        # A list, since BERTScore's compute_idf needs len(); stream with iter_sentences() otherwise
+        return list(self.iter_sentences())
+
+    @cached_property
+    def _index(self) -> dict[str, CaptionedVideo]:
+        return {v.video_id: v for v in self.load()}
 
     def find(self, video_id):
-        return next((v for v in self.load() if v.video_id == video_id), None) # TODO load_iter
+        if self._cache_complete or '_index' in self.__dict__:
+            return self._index.get(video_id)
+        # Nothing loaded yet: stream and stop at the first match
+        return next((v for v in self.load_iter() if v.video_id == video_id), None)
 
 
 class ToyDataLoader(BaseDataLoader):
@@ -35,60 +136,107 @@ class ToyDataLoader(BaseDataLoader):
     def __init__(self, data_path: str):
         self.data_path = data_path
 
-    def load(self, limit:int|None=None) -> list[CaptionedVideo]:
-        all_videos = []
-        with open(self.data_path, 'r') as f:
-            data = json.load(f)
+    def _load(self, limit:int|None) -> list[CaptionedVideo]:
+        data = _read_json(self.data_path)
 
         if limit:
             data = data[:limit]
-        for video_data in data:
-            clips = [
-                CaptionedClip(
-                    timestamp=TimestampRange(start=clip_data["timestamp"]-1, end=clip_data["timestamp"]),
-                    data=NarrativeOnlyPayload(caption=clip_data["description"])
-                ) for clip_data in video_data["clips"]
+        return _VIDEO_LIST_ADAPTER.validate_python([self._raw_video(video_data) for video_data in data])
+
+    def _iter_videos(self) -> Iterator[CaptionedVideo]:
+        for video_data in _read_json(self.data_path):
+            yield CaptionedVideo.model_validate(self._raw_video(video_data))
+
+    @staticmethod
+    def _raw_video(video_data: dict) -> dict:
+        return {
+            "video_id": video_data["video_id"],
+            "clips": [
+                {
+                    "timestamp": {"start": clip_data["timestamp"]-1, "end": clip_data["timestamp"]},
+                    "data": {"caption": clip_data["description"]}
+                } for clip_data in video_data["clips"]
             ]
-            all_videos.append(
-                CaptionedVideo(video_id=video_data["video_id"], clips=clips)
-            )
-        return all_videos
+        }
+
+    def iter_sentences(self):
+        data = _read_json(self.data_path)
+        for video_data in data:
+            for clip_data in video_data["clips"]:
+                yield clip_data["description"]
 
 class VideoStorytellingLoader(BaseDataLoader):
     """Loads data from the Video Storytelling dataset format."""
-    def __init__(self, data_path: str, limit=None):
+    def __init__(self, data_path: str, limit=None, io_workers: int = 16):
         self.data_path = data_path
         self.limit = limit
+        # Threads only overlap the open/read syscalls (the GIL is released during I/O); parsing stays serial
+        self.io_workers = io_workers
 
     def find(self, video_id):
         return self.load_file(video_id+".txt")
 
-    def load(self, limit:int|None=None) -> list[CaptionedVideo]:
+    def _load(self, limit:int|None) -> list[CaptionedVideo]:
         logging.info(f"Loading from Video Storytelling dataset at: {self.data_path} {self.limit=}")
-        filenames = sorted([f for f in os.listdir(self.data_path) if f.endswith(".txt")])
-        if _limit := limit or self.limit:
-            filenames = filenames[:_limit]
+        entries = self._sorted_entries()
+        if limit:
+            entries = entries[:limit]
+
+        return _VIDEO_LIST_ADAPTER.validate_python(
+            [self._raw_video(e.name, body) for e, body in zip(entries, self._read_bodies(entries))]
+        )
+
+    def _iter_videos(self) -> Iterator[CaptionedVideo]:
+        entries = self._sorted_entries()
+        for e, body in zip(entries, self._read_bodies(entries)):
+            yield CaptionedVideo.model_validate(self._raw_video(e.name, body))
 
-        return [self.load_file(filename) for filename in filenames]
+    def iter_sentences(self):
+        for body in self._read_bodies(self._sorted_entries()):
+            for _, _, caption in _storytelling_rows(body):
+                yield caption
+
+    def _read_bodies(self, entries: list[os.DirEntry]):
+        """Reads the given files concurrently, yielding their bodies in order."""
+        if self.io_workers <= 1 or len(entries) <= 1:
+            yield from (self._read_body(e.path) for e in entries)
+            return
+        with ThreadPoolExecutor(max_workers=min(self.io_workers, len(entries))) as ex:
+            yield from ex.map(self._read_body, [e.path for e in entries])
+
+    def _sorted_entries(self) -> list[os.DirEntry]:
+        with os.scandir(self.data_path) as it:
+            # DirEntry.is_file uses the d_type from the directory read, so this costs no extra stat
+            return sorted((e for e in it if e.name.endswith(".txt") and e.is_file()), key=lambda e: e.name)
+
+    @staticmethod
+    def _read_body(file_path: str) -> str:
+        # A plain binary read + one decode beats text-mode I/O (and mmap) for these small files
+        with open(file_path, 'rb') as f:
+            text = f.read().decode('utf-8')
+        if '\r' in text:
+            # Universal newlines, as text mode did: a bare '\r' also ends a line
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        _, _, body = text.partition('\n')  # Skip video ID line
+        return body
 
     def load_file(self, filename:str) -> CaptionedVideo:
         file_path = os.path.join(self.data_path, filename)
-        video_id = filename.replace('.txt', '')
-        clips = []
-        with open(file_path, 'r') as f:
-            lines = f.readlines()[1:]  # Skip video ID line
-            for line in lines:
-                parts = line.strip().split()
-                if len(parts) < 3: continue
-                start_time_str = parts[0]
-                end_time_str = parts[1]
-                description = " ".join(parts[2:])
-                clips.append(CaptionedClip(
-                    timestamp=TimestampRange(start=_parse_storytelling_timestamp(start_time_str),
-                                             end=_parse_storytelling_timestamp(end_time_str)),
-                    data=NarrativeOnlyPayload(caption=description)
-                ))
-            return CaptionedVideo(video_id=video_id, clips=clips)
+        return CaptionedVideo.model_validate(self._raw_video(filename, self._read_body(file_path)))
+
+    @staticmethod
+    def _raw_video(filename: str, body: str) -> dict:
+        """Builds the plain-dict form of a CaptionedVideo; validation happens in one batched pass."""
+        rows = _storytelling_rows(body)
+        # The row count is known up front, so fill a pre-sized list rather than growing one
+        clips = [None] * len(rows)
+        for i, (start_str, end_str, caption) in enumerate(rows):
+            clips[i] = {
+                "timestamp": {"start": _parse_storytelling_timestamp(start_str),
+                              "end": _parse_storytelling_timestamp(end_str)},
+                "data": {"caption": caption}
+            }
+        return {"video_id": filename.replace('.txt', ''), "clips": clips}
 
 
 class VatexLoader(BaseDataLoader):
@@ -97,26 +245,38 @@ class VatexLoader(BaseDataLoader):
         self.data_path = data_path
         self.limit = limit
 
-    def load(self, limit:int|None=None) -> list[CaptionedVideo]:
+    def _load(self, limit:int|None) -> list[CaptionedVideo]:
         logging.info(f"Loading from VATEX dataset at: {self.data_path} {self.limit=}")
-        all_videos = []
-        with open(self.data_path, 'r') as f:
-            data = json.load(f)
-
-        if _limit:= limit or self.limit:
-            data = data[:_limit]
-
-        for video_info in data:
-            video_id = video_info["videoID"]
-            captions = video_info["enCap"][:5]
-            clips = []
-            for i, caption in enumerate(captions):
-                clips.append(CaptionedClip(
-                    timestamp=TimestampRange(start=float(i), end=float(i + 1)),
-                    data=NarrativeOnlyPayload(caption=caption)
-                ))
-            all_videos.append(CaptionedVideo(video_id=video_id, clips=clips))
-        return all_videos
+        data = itertools.islice(self._iter_records(), limit)
+        return _VIDEO_LIST_ADAPTER.validate_python([self._raw_video(video_info) for video_info in data])
+
+    def _iter_videos(self) -> Iterator[CaptionedVideo]:
+        for video_info in self._iter_records():
+            yield CaptionedVideo.model_validate(self._raw_video(video_info))
+
+    @staticmethod
+    def _raw_video(video_info: dict) -> dict:
+        return {
+            "video_id": video_info["videoID"],
+            "clips": [
+                {
+                    "timestamp": {"start": float(i), "end": float(i + 1)},
+                    "data": {"caption": caption}
+                } for i, caption in enumerate(video_info["enCap"][:5])
+            ]
+        }
+
+    def iter_sentences(self):
+        for video_info in self._iter_records():
+            yield from video_info["enCap"][:5]
+
+    def _iter_records(self):
+        """
+        Streams the top-level array one video at a time, so only the current record
+        (not the whole decoded file, which also holds the Chinese captions) is alive.
+        """
+        with open(self.data_path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
 
 def get_data_loader(data_config: dict) -> BaseDataLoader:
     """
@@ -133,7 +293,7 @@ def get_data_loader(data_config: dict) -> BaseDataLoader:
     if dataset_name == "vatex":
         return VatexLoader(data_path, limit)
     elif dataset_name == "video_storytelling":
-        return VideoStorytellingLoader(data_path, limit)
+        return VideoStorytellingLoader(data_path, limit, io_workers=data_config.get("io_workers", 16))
     elif dataset_name == "toy_data":
         return ToyDataLoader(data_path)
     else:
@@ -1,20 +1,28 @@
+import numpy as np
 from pydantic import BaseModel, Field, ConfigDict, field_validator
-from typing import Union
+from typing import NamedTuple, Union
 
 # A unique token to indicate that the data for a clip has been masked.
 # We will instruct the LLM to replace this token with a valid data object.
 DATA_MISSING = "[DATA_MISSING]"
 
+# Loaded videos are cached and shared between runs (see BaseDataLoader.load), so all
+# models are frozen: derive changed copies with model_copy(update=...) instead of mutating.
+_FROZEN = ConfigDict(frozen=True)
+
 class NarrativeOnlyPayload(BaseModel):
+    model_config = _FROZEN
     caption: str
 
 class StructuredPayload(BaseModel):
+    model_config = _FROZEN
     caption: str
     objects: list[str] = Field(default_factory=list)
     verbs: list[str] = Field(default_factory=list)
 
 class TimestampRange(BaseModel):
     """Represents a time range with a start and end point."""
+    model_config = _FROZEN
     start: float = Field(..., ge=0, description="Start time of the clip in seconds.")
     end: float = Field(..., ge=0, description="End time of the clip in seconds.")
 
@@ -31,7 +39,7 @@ class CaptionedClip(BaseModel):
     """
     Represents a single clip in the caption using a time range.
     """
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
     timestamp: TimestampRange
     data: Union[NarrativeOnlyPayload, StructuredPayload, str]
 
@@ -40,5 +48,29 @@ class CaptionedVideo(BaseModel):
     Represents a complete transcript for a single video, including metadata
     and the sequence of clips.
     """
+    model_config = _FROZEN
     video_id: str = Field(..., description="A unique identifier for the video.")
     clips: list[CaptionedClip] = Field(..., description="An ordered list of captioned clips.")
+
+    def to_columns(self) -> "ClipColumns":
+        """
+        Returns the clips as parallel columns (struct-of-arrays), for analytical passes
+        that only need captions and timestamps. Not cached: model_copy would carry a
+        cached value over to copies with different clips.
+        """
+        clips = self.clips
+        n = len(clips)
+        starts = np.empty(n, dtype=float)
+        ends = np.empty(n, dtype=float)
+        captions = [None] * n
+        for i, c in enumerate(clips):
+            starts[i] = c.timestamp.start
+            ends[i] = c.timestamp.end
+            captions[i] = c.data if isinstance(c.data, str) else c.data.caption
+        return ClipColumns(captions=captions, starts=starts, ends=ends)
+
+class ClipColumns(NamedTuple):
+    """Column view of a CaptionedVideo's clips (see CaptionedVideo.to_columns)."""
+    captions: list[str]
+    starts: np.ndarray
+    ends: np.ndarray
@@ -41,17 +41,15 @@ all_videos = data_loader.load()
 print(f"Loaded {len(all_videos)} videos.")
 
 # --- 3. Convert to DataFrame ---
-records = []
-for video in all_videos:
-    for clip in video.clips:
-        records.append({
-            "video_id": video.video_id,
-            "timestamp": clip.timestamp,
-            "description": clip.data.description,
-            "word_count": len(clip.data.description.split())
-        })
+# Build per-video column views and concatenate them, instead of a dict per clip
+columns = [video.to_columns() for video in all_videos]
 
-df = pd.DataFrame(records)
+df = pd.DataFrame({
+    "video_id": pd.Categorical(np.repeat([v.video_id for v in all_videos], [len(c.captions) for c in columns])),
+    "timestamp": np.concatenate([c.ends for c in columns]) if columns else np.empty(0),
+    "description": [caption for c in columns for caption in c.captions],
+})
+df["word_count"] = df["description"].str.split().str.len()
 
 # --- 4. Calculate and Display Statistics ---
 if not df.empty:
@@ -62,7 +60,7 @@ if not df.empty:
     print(f"Total Captions (Clips): {total_captions}")
 
     # Use .map() instead of the deprecated .applymap()
-    captions_per_video_stats = df.groupby('video_id').size().describe().to_frame().map(custom_float_formatter)
+    captions_per_video_stats = df.groupby('video_id', observed=True).size().describe().to_frame().map(custom_float_formatter)
     print("\n--- Captions per Video ---")
     print(captions_per_video_stats)
 
@@ -70,7 +68,7 @@ if not df.empty:
     print("\n--- Caption Length (in words) ---")
     print(word_count_stats)
 
-    video_durations_seconds = df.groupby('video_id')['timestamp'].max()
+    video_durations_seconds = df.groupby('video_id', observed=True)['timestamp'].max()
     duration_stats_seconds = video_durations_seconds.describe().to_frame().map(custom_float_formatter)
     print("\n--- Video Duration (in seconds, based on last timestamp) ---")
     print(duration_stats_seconds)
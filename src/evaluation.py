@@ -1,7 +1,16 @@
+import copy
+import hashlib
 import logging
+import os
+import pickle
+from collections import OrderedDict, defaultdict
+from functools import lru_cache, partial
+import torch
+from torch.nn.utils.rnn import pad_sequence
 from bert_score import BERTScorer
+from bert_score.utils import get_bert_embedding, greedy_cos_idf
 from data_models import CaptionedVideo
-import json
+import orjson
 from reconstruction_strategies import Reconstructed
 
 logger = logging.getLogger(__name__)
@@ -10,36 +19,105 @@ def round_metrics(metrics, ndigits=6) -> dict:
     m = {}
     for k,v in metrics.items():
         if k.startswith('bs_'):
-            m[k] = [round(x.item(), ndigits) for x in v]
+            # One device->host transfer per tensor instead of one .item() per element
+            m[k] = [round(x, ndigits) for x in v.detach().cpu().tolist()]
         else:
             m[k] = v
     return m
 
-def metrics_to_json(metrics):
-    return json.dumps(metrics)
+def metrics_to_json(metrics) -> str:
+    return orjson.dumps(metrics, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+@lru_cache(maxsize=4)
+def _load_bert_scorer(model_type: str|None, rescale_with_baseline: bool, device: str|None, half_precision: bool,
+                      use_fast_tokenizer: bool, compile_model: bool, quantize_cpu: bool) -> BERTScorer:
+    """
+    Builds a BERTScorer, loading its HF model and tokenizer from disk.
+    Memoized, so evaluators for the same model (e.g. with and without idf) share one loaded model.
+    """
+    scorer = BERTScorer(
+        model_type=model_type,
+        rescale_with_baseline=rescale_with_baseline,
+        use_fast_tokenizer=use_fast_tokenizer,
+        lang="en",
+        device=device
+    )
+    if half_precision and scorer.device.startswith("cuda"):
+        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        scorer._model.to(dtype)
+    if quantize_cpu and scorer.device == "cpu":
+        # Dynamic int8 quantization of the Linear layers (weights int8, activations quantized per batch)
+        scorer._model = torch.ao.quantization.quantize_dynamic(scorer._model, {torch.nn.Linear}, dtype=torch.qint8)
+    if compile_model:
+        # dynamic=True: batch and sequence lengths vary, so avoid recompiling per shape
+        scorer._model = torch.compile(scorer._model, dynamic=True)
+    return scorer
+
+def _pad_stats(stats: list[tuple[torch.Tensor, torch.Tensor]], device) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Pads per-sentence (embedding, idf) pairs into a batch, as bert_score does before greedy matching."""
+    embs, idfs = zip(*stats)
+    lens = torch.tensor([e.size(0) for e in embs])
+    emb_pad = pad_sequence(embs, batch_first=True, padding_value=2.0)
+    idf_pad = pad_sequence(idfs, batch_first=True)
+    mask = torch.arange(int(lens.max())) < lens.unsqueeze(1)
+    if device.type == "cuda":
+        # Pad on the host, then one pinned, non-blocking copy per tensor instead of one copy per sentence
+        return tuple(t.pin_memory().to(device, non_blocking=True) for t in (emb_pad, mask, idf_pad))
+    return emb_pad, mask, idf_pad
 
 class ReconstructionEvaluator:
     """
     Encapsulates the logic for evaluating caption reconstruction using BERTScore.
     """
 
-    def __init__(self, model_type:str|None=None, idf:bool=False, verbose=False):
+    def __init__(self, model_type:str|None=None, idf:bool=False, verbose=False, rescale_with_baseline:bool=False,
+                 batch_size:int=64, device:str|None=None, half_precision:bool=False,
+                 use_fast_tokenizer:bool=False, compile_model:bool=False, embedding_cache_size:int=0,
+                 idf_cache_dir:str|None=None, quantize_cpu:bool=False, score_cache_size:int=0):
         """
         Initializes the evaluator with configuration for BERTScore.
 
         Args:
             model_type: The Hugging Face model to use for BERTScore.
             idf: A boolean indicating whether to use inverse-document-frequency weighting.
+            rescale_with_baseline: Whether BERTScore rescales scores with its precomputed baseline.
+            batch_size: Sentences per BERTScore forward pass; halved automatically on CUDA OOM.
+            device: Torch device for the scorer model; None lets BERTScore pick CUDA when available.
+            half_precision: On CUDA, run the model in bfloat16 (float16 where bf16 is unsupported).
+                Off by default, since scores then differ slightly from full-precision runs.
+            use_fast_tokenizer: Use the Rust-backed HF tokenizer. Off by default: bert_score only adds
+                the leading space for the slow GPT-2/RoBERTa tokenizer classes, so for BPE models
+                (roberta, deberta) the fast tokenizer encodes the first word differently and scores shift.
+            compile_model: Wrap the scorer model with torch.compile. Pays a one-off compile cost, so it
+                only helps long runs; set TORCHINDUCTOR_CACHE_DIR to reuse kernels across processes.
+            embedding_cache_size: Number of sentences whose token embeddings are kept between calls
+                (LRU), so ground-truth captions scored by several runs are encoded once. 0 disables
+                the cache and scores through BERTScorer.score directly.
+            idf_cache_dir: Directory where calc_idf persists IDF dicts, keyed by tokenizer and corpus,
+                so later processes skip re-tokenizing the corpus. None disables persistence.
+            quantize_cpu: When the scorer runs on the CPU, quantize its Linear layers to int8
+                (dynamic quantization). Faster on CPU, but scores shift slightly, so off by default.
+            score_cache_size: Number of (candidate, reference) pairs whose P/R/F1 are kept between calls
+                (LRU), so runs that reproduce earlier reconstructions skip the model. 0 disables it.
         """
         self.model_type = model_type
         self.idf = idf
         self.verbose = verbose
-        self.bert_scorer = BERTScorer(
-            model_type=self.model_type,
-            idf=self.idf,
-            use_fast_tokenizer=False,
-            lang="en"
-        )
+        self.rescale_with_baseline = rescale_with_baseline
+        self.batch_size = batch_size
+        # Shallow copy: the loaded model is shared, while the idf flag and calc_idf's dict stay per evaluator
+        self.bert_scorer = copy.copy(_load_bert_scorer(
+            self.model_type, self.rescale_with_baseline, device, half_precision, use_fast_tokenizer, compile_model,
+            quantize_cpu
+        ))
+        self.bert_scorer._idf = self.idf
+        self.embedding_cache_size = embedding_cache_size
+        self.idf_cache_dir = idf_cache_dir
+        # sentence -> (token embeddings, token idf weights), both on the CPU
+        self._embedding_cache: OrderedDict[str, tuple[torch.Tensor, torch.Tensor]] = OrderedDict()
+        self.score_cache_size = score_cache_size
+        # (candidate, reference) -> (P, R, F1)
+        self._score_cache: OrderedDict[tuple[str, str], tuple[float, float, float]] = OrderedDict()
         logger.info(f"ReconstructionEvaluator initialized with model: {self.model_type}, idf: {self.idf}")
 
     def evaluate(
@@ -47,32 +125,207 @@ class ReconstructionEvaluator:
             reconstructed: Reconstructed,
             orig: CaptionedVideo
     ) -> dict:
+        return self.evaluate_many([(reconstructed, orig)])[0]
+
+    def evaluate_many(self, items: list[tuple[Reconstructed, CaptionedVideo]]) -> list[dict]:
+        """
+        Evaluates several videos with a single BERTScore call.
+        The aligned pairs of all videos are scored together, and the P/R/F1 tensors
+        are sliced back per video, so the model is run over full batches once.
+
+        Returns:
+            One metrics dict per item, in order ({} for items without reconstructed clips).
+        """
         logger.debug("Aligning clips for BERTScore evaluation...")
 
-        candidates, references = reconstructed.align(orig.clips)
+        all_candidates, all_references = [], []
+        offsets = []
+        for reconstructed, orig in items:
+            candidates, references = reconstructed.align(orig.clips)
+            if not candidates:
+                logger.warning(f"No reconstructed clips found to evaluate for {orig.video_id}.")
+            start = len(all_candidates)
+            all_candidates.extend(candidates)
+            all_references.extend(references)
+            offsets.append((start, len(all_candidates)))
+
+        if not all_candidates:
+            return [{} for _ in items]
+
+        logger.debug(f"Calculating BERTScore for {len(all_candidates)} clip pairs from {len(items)} videos.")
+
+        bs_p, bs_r, bs_f1 = self._score_pairs(all_candidates, all_references)
+
+        return [
+            {
+                "bs_p": bs_p[start:end],
+                "bs_r": bs_r[start:end],
+                "bs_f1": bs_f1[start:end]
+            } if end > start else {}
+            for start, end in offsets
+        ]
 
-        if not candidates:
-            logger.warning("No reconstructed clips found to evaluate.")
-            return {}
+    def _score_pairs(self, candidates: list[str], references: list[str]):
+        """
+        Scores the pairs, running the model once per distinct (candidate, reference) pair.
+        A candidate identical to its (non-empty) reference gets a perfect P/R/F1 of 1.0
+        without running the model, and pairs in the score cache reuse their earlier scores.
+        """
+        pair_index: dict[tuple[str, str], int] = {}
+        inverse = [pair_index.setdefault(pair, len(pair_index)) for pair in zip(candidates, references)]
+        pairs = list(pair_index)
+        cached = {}
+        to_score = []
+        for i, (c, r) in enumerate(pairs):
+            if c == r and c.strip():
+                continue
+            hit = self._score_cache.get((c, r)) if self.score_cache_size > 0 else None
+            if hit is None:
+                to_score.append(i)
+            else:
+                self._score_cache.move_to_end((c, r))
+                cached[i] = hit
+        if len(to_score) == len(candidates):  # all pairs distinct, none identical or cached
+            bs_p, bs_r, bs_f1 = self._score(candidates, references)
+            self._remember_scores(pairs, bs_p, bs_r, bs_f1)
+            return bs_p, bs_r, bs_f1
+
+        scores = torch.ones(3, len(pairs))
+        if cached:
+            scores[:, list(cached)] = torch.tensor(list(cached.values())).T
+        if to_score:
+            bs_p, bs_r, bs_f1 = self._score([pairs[i][0] for i in to_score], [pairs[i][1] for i in to_score])
+            scores[:, torch.tensor(to_score)] = torch.stack((bs_p, bs_r, bs_f1)).to(scores.dtype)
+            self._remember_scores([pairs[i] for i in to_score], bs_p, bs_r, bs_f1)
+        logger.debug(f"Scored {len(to_score)} of {len(candidates)} caption pairs (duplicates, identical and cached pairs skipped).")
+        scores = scores[:, torch.tensor(inverse)]
+        return scores[0], scores[1], scores[2]
+
+    def _remember_scores(self, pairs: list[tuple[str, str]], bs_p, bs_r, bs_f1):
+        if self.score_cache_size <= 0:
+            return
+        for pair, prf in zip(pairs, torch.stack((bs_p, bs_r, bs_f1), dim=1).tolist()):
+            self._score_cache[pair] = tuple(prf)
+            self._score_cache.move_to_end(pair)
+        while len(self._score_cache) > self.score_cache_size:
+            self._score_cache.popitem(last=False)
+
+    def _score(self, candidates: list[str], references: list[str]):
+        """Scores the pairs, halving the batch size (and keeping it) on CUDA out-of-memory."""
+        while True:
+            try:
+                with torch.inference_mode():
+                    if self.embedding_cache_size > 0:
+                        return self._score_cached(candidates, references)
+                    return self.bert_scorer.score(
+                        cands=candidates,
+                        refs=references,
+                        batch_size=self.batch_size
+                    )
+            except torch.cuda.OutOfMemoryError:
+                if self.batch_size <= 1:
+                    raise
+                torch.cuda.empty_cache()
+                self.batch_size //= 2
+                logger.warning(f"CUDA out of memory in BERTScore, retrying with batch_size={self.batch_size}")
+
+    def _score_cached(self, candidates: list[str], references: list[str]):
+        """
+        The computation of BERTScorer.score (single layer), except that sentence embeddings
+        come from / go to the evaluator's LRU cache, so only unseen sentences hit the model.
+        """
+        scorer = self.bert_scorer
+        stats = {}
+        missing = []
+        for sent in dict.fromkeys(references + candidates):
+            hit = self._embedding_cache.get(sent)
+            if hit is None:
+                missing.append(sent)
+            else:
+                stats[sent] = hit
+
+        # Longest first (as bert_score does), so each encoded batch pads to similar lengths
+        missing.sort(key=lambda x: len(x.split(" ")), reverse=True)
+        idf_dict = self._idf_weights()
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            embs, masks, padded_idf = get_bert_embedding(batch, scorer._model, scorer._tokenizer, idf_dict, device=scorer.device)
+            lens = masks.sum(dim=1).tolist()
+            embs, padded_idf = embs.cpu(), padded_idf.cpu()
+            for i, sent in enumerate(batch):
+                # Clone, so a cached sentence doesn't keep its whole padded batch alive
+                stats[sent] = (embs[i, :lens[i]].clone(), padded_idf[i, :lens[i]].clone())
 
-        logger.debug(f"Calculating BERTScore for {len(candidates)} clip pairs.")
+        for sent, sent_stats in stats.items():
+            self._embedding_cache[sent] = sent_stats
+            self._embedding_cache.move_to_end(sent)
+        while len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
 
-        bs_p, bs_r, bs_f1 = self.bert_scorer.score(
-            cands=candidates,
-            refs=references,
-            batch_size=4
-        )
+        # Match pairs in order of token length, so each batch pads to similar lengths
+        # (bert_score matches in input order), then scatter the scores back
+        order = sorted(range(len(references)),
+                       key=lambda i: max(len(stats[references[i]][0]), len(stats[candidates[i]][0])))
+        device = next(scorer._model.parameters()).device
+        preds = []
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            ref_stats = _pad_stats([stats[references[i]] for i in batch], device)
+            hyp_stats = _pad_stats([stats[candidates[i]] for i in batch], device)
+            P, R, F1 = greedy_cos_idf(*ref_stats, *hyp_stats)
+            preds.append(torch.stack((P, R, F1), dim=-1).cpu())
+        sorted_preds = torch.cat(preds, dim=0)
+        all_preds = torch.empty_like(sorted_preds)
+        all_preds[torch.tensor(order)] = sorted_preds
 
-        metrics = {
-            "bs_p": bs_p,
-            "bs_r": bs_r,
-            "bs_f1": bs_f1
-        }
+        if scorer.rescale_with_baseline:
+            all_preds = (all_preds - scorer.baseline_vals) / (1 - scorer.baseline_vals)
+        return all_preds[..., 0], all_preds[..., 1], all_preds[..., 2]
 
-        return metrics
+    def _idf_cache_path(self, sents: list[str]) -> str|None:
+        if not self.idf_cache_dir:
+            return None
+        scorer = self.bert_scorer
+        h = hashlib.sha256(f"{scorer.model_type}|{type(scorer._tokenizer).__name__}".encode())
+        for sent in sents:
+            h.update(sent.encode())
+            h.update(b"\0")
+        return os.path.join(self.idf_cache_dir, f"idf_{h.hexdigest()}.pkl")
+
+    def _save_idf(self, cache_path: str):
+        idf_dict = self.bert_scorer._idf_dict
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((dict(idf_dict), idf_dict.default_factory()), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)  # atomic, so concurrent runs never read a partial file
+
+    def _idf_weights(self):
+        """The token weights BERTScorer.score would use: the idf dict, or 1 for every non-special token."""
+        scorer = self.bert_scorer
+        if scorer.idf:
+            assert scorer._idf_dict, "IDF weights are not computed"
+            return scorer._idf_dict
+        idf_dict = defaultdict(lambda: 1.0)
+        idf_dict[scorer._tokenizer.sep_token_id] = 0
+        idf_dict[scorer._tokenizer.cls_token_id] = 0
+        return idf_dict
 
     def calc_idf(self, sents: list[str]):
         self.idf = True
-        self.bert_scorer.compute_idf(sents=sents)
+        cache_path = self._idf_cache_path(sents)
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                weights, default = pickle.load(f)
+            # Same shape as bert_score's get_idf_dict: unseen tokens get the maximal idf
+            self.bert_scorer._idf_dict = defaultdict(partial(float, default), weights)
+            logger.info(f'loaded idf_dict from {cache_path}')
+        else:
+            self.bert_scorer.compute_idf(sents=sents)
+            if cache_path:
+                self._save_idf(cache_path)
+        # Cached stats and scores carry the old idf weights
+        self._embedding_cache.clear()
+        self._score_cache.clear()
         logger.info(f'finished calc_idf for {len(sents)} sentences, idf_dict size = {len(self.bert_scorer._idf_dict.keys())}')
         return self
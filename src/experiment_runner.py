@@ -1,5 +1,7 @@
-import statistics
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
 
 from data_loaders import BaseDataLoader
 from masking import MaskingStrategy
@@ -19,36 +21,49 @@ class ExperimentRunner:
         data_loader: BaseDataLoader,
         masking_strategy: MaskingStrategy,
         reconstruction_strategy: ReconstructionStrategy,
-        evaluator: ReconstructionEvaluator
+        evaluator: ReconstructionEvaluator,
+        reconstruct_workers: int = 8
     ):
         self.run_name = run_name
         self.data_loader = data_loader
         self.masking_strategy = masking_strategy
         self.reconstruction_strategy = reconstruction_strategy
         self.evaluator = evaluator
+        # Reconstruction is mostly waiting on the LLM API, so videos are reconstructed concurrently
+        self.reconstruct_workers = reconstruct_workers
 
     def run(self) -> tuple[dict, list[str]]:
-        """Runs the full experiment from data loading to evaluation."""
+        """
+        Runs the full experiment from data loading to evaluation.
+        Videos are masked (in order, so the masking RNG sequence is unchanged), then reconstructed
+        concurrently; all reconstructions that pass the checks are scored with a single batched
+        BERTScore call.
+        """
         all_videos:list[CaptionedVideo] = self.data_loader.load()
-        all_metrics:list[dict] = []
-        all_recon_videos:list[str] = []
+        all_recon_videos:list[str|None] = []
+        # (slot in all_recon_videos, reconstructed, original video, masked indices) awaiting evaluation
+        to_evaluate = []
+
+        masked = [(video, *self.masking_strategy.mask_video(video)) for video in all_videos]
+        reconstructions = iter(self._reconstruct_all([masked_video for _, masked_video, _ in masked if masked_video]))
 
-        for video in all_videos:
-            logging.debug(f"--- Processing Video: {video.video_id} ---")
+        for video, masked_video, masked_indices in masked:
+            logging.debug("--- Processing Video: %s ---", video.video_id)
 
-            masked_video, masked_indices = self.masking_strategy.mask_video(video)
             if not masked_video:
                 logging.warning(f"Not masking video {video.video_id} size={len(video.clips)} with {self.masking_strategy}")
                 all_recon_videos.append(f"SKIP {video.video_id=} NOT_MASKING")
                 continue
 
-            reconstructed = self.reconstruction_strategy.reconstruct(masked_video)
+            reconstructed = next(reconstructions)
             if not reconstructed or not reconstructed.reconstructed_clips:
                 logging.error(f"Reconstruction failed for video: {video.video_id}")
                 all_recon_videos.append(f"SKIP {video.video_id=} FAIL")
                 continue
 
-            if reconstructed.reconstructed_clips.keys() != masked_indices and not reconstructed.debug_data:
+            # masked_indices is a set, so this is a plain set comparison; it's reused by the checks below
+            indices_match = reconstructed.reconstructed_clips.keys() == masked_indices
+            if not indices_match and not reconstructed.debug_data:
                 crit_msg = f"Reconstruction failed for video: {video.video_id}, {reconstructed.reconstructed_clips.keys()=} != {masked_indices=}"
                 logging.critical(crit_msg)
                 raise Exception(crit_msg)
@@ -57,44 +72,53 @@ class ExperimentRunner:
                 logging.warning(f'Masked data found in reconstructed_video {video.video_id}, skipping')
                 all_recon_videos.append(reconstructed.skip('failed>0').json_str())
                 continue
-            elif reconstructed.reconstructed_clips.keys() != masked_indices:
+            elif not indices_match:
                 logging.warning(f'Bad indices found in reconstructed_video {video.video_id}, {reconstructed.indices=}, {masked_indices=}, skipping')
                 all_recon_videos.append(reconstructed.skip(f"{masked_indices=}").json_str())
                 continue
             elif reconstructed.debug_data:
                 logging.warning(f'Problems found in reconstructed_video {video.video_id}, proceeding anyway')
 
-            video_metrics = self.evaluator.evaluate(reconstructed, video)
+            # Keep this video's place in the output; its record is written after evaluation
+            to_evaluate.append((len(all_recon_videos), reconstructed, video, masked_indices))
+            all_recon_videos.append(None)
 
-            all_metrics.append(video_metrics)
+        all_video_metrics = self.evaluator.evaluate_many([(r, v) for _, r, v, _ in to_evaluate])
+        # Each video's minimum F1/P/R, filled as the records are written; the aggregates reduce only these
+        minimums = torch.empty(len(all_video_metrics), 3, dtype=torch.float64)
 
+        for i, ((slot, reconstructed, video, masked_indices), video_metrics) in enumerate(zip(to_evaluate, all_video_metrics)):
+            minimums[i] = torch.stack([video_metrics[k].min() for k in ("bs_f1", "bs_p", "bs_r")])
             metrics = round_metrics(video_metrics)
-            all_recon_videos.append(reconstructed.with_metrics(metrics).json_str())
-
-            metrics.update({
-                "num_captions": len(video.clips),
-                "masked": list(masked_indices)
-            })
+            all_recon_videos[slot] = reconstructed.with_metrics(metrics).json_str()
 
-            logging.info(f"Evaluation complete for "
-                         f"video_id={video.video_id} "
-                         f"metrics={metrics_to_json(metrics)}")
+            # Only serialize the metrics when the line is actually emitted
+            if logging.root.isEnabledFor(logging.INFO):
+                metrics.update({
+                    "num_captions": len(video.clips),
+                    "masked": list(masked_indices)
+                })
+                logging.info("Evaluation complete for video_id=%s metrics=%s", video.video_id, metrics_to_json(metrics))
 
-            logging.debug(f"Successfully processed video: {video.video_id}")
+            logging.debug("Successfully processed video: %s", video.video_id)
 
-        if not all_metrics:
+        if not all_video_metrics:
             raise Exception("No metrics were generated to log.")
 
-        # TODO: keep only the sums (NA as 0)
-        mean_f1 = statistics.mean([m['bs_f1'].min().item() for m in all_metrics])
-        mean_precision = statistics.mean([m['bs_p'].min().item() for m in all_metrics])
-        mean_recall = statistics.mean([m['bs_r'].min().item() for m in all_metrics])
-
+        # Mean over videos of each video's minimum score, all three metrics in one reduction
+        mean_f1, mean_precision, mean_recall = minimums.mean(dim=0).tolist()
         agg_metrics = {
-            "num_of_instances": len(all_metrics),
+            "num_of_instances": len(all_video_metrics),
             "mean_f1_score": mean_f1,
             "mean_precision": mean_precision,
             "mean_recall": mean_recall
         }
 
         return agg_metrics, all_recon_videos
+
+    def _reconstruct_all(self, masked_videos: list[CaptionedVideo]) -> list:
+        """Reconstructs the given videos on a thread pool, returning the results in input order."""
+        if self.reconstruct_workers <= 1 or len(masked_videos) <= 1:
+            return [self.reconstruction_strategy.reconstruct(v) for v in masked_videos]
+        with ThreadPoolExecutor(max_workers=min(self.reconstruct_workers, len(masked_videos))) as ex:
+            return list(ex.map(self.reconstruction_strategy.reconstruct, masked_videos))
@@ -1,12 +1,51 @@
 # src/llm_interaction.py
 import os
+import re
 import logging
+import threading
 from joblib import Memory
-from tenacity import retry, wait_random_exponential, stop_after_attempt, retry_if_exception_type
+from tenacity import retry, wait_exponential, wait_random, stop_after_attempt, stop_after_delay, retry_if_exception, before_sleep_log
 import google.generativeai as genai
 import google.api_core.exceptions
 from google.generativeai.types import GenerationConfig
 
+# A per-day quota won't recover within the retry budget, so it is not worth waiting on
+_DAILY_QUOTA_RE = re.compile(r'per[ _-]?day|daily', re.IGNORECASE)
+
+def _is_transient(e: BaseException) -> bool:
+    """Rate limits (except daily quotas) and 5xx server errors are retried; everything else fails fast."""
+    if isinstance(e, google.api_core.exceptions.ResourceExhausted):
+        return not _DAILY_QUOTA_RE.search(str(e))
+    # ServerError includes DeadlineExceeded, raised when a request hits the timeout
+    return isinstance(e, (google.api_core.exceptions.ServerError, ConnectionError))
+
+class _AIMDLimiter:
+    """
+    Caps concurrent LLM requests with AIMD backpressure: the cap halves whenever a request is
+    rate limited and grows back by about one per round of successful requests, up to max_limit.
+    """
+    def __init__(self, max_limit: int):
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._cond:
+            self._in_flight -= 1
+            if isinstance(exc, google.api_core.exceptions.ResourceExhausted):
+                self.limit = max(1.0, self.limit / 2)
+            elif exc is None:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+        return False
+
 def build_llm_manager(config):
     llm_config = config['llm']
     api_key = os.getenv("GEMINI_API_KEY")
@@ -18,18 +57,25 @@ def build_llm_manager(config):
         base_cache_dir=config['paths']['joblib_cache'].removesuffix('/'),
         model_name=llm_config['model_name'],
         temperature=llm_config['temperature'],
-        system_prompt=None # TODO system_prompt
+        system_prompt=None, # TODO system_prompt
+        max_concurrent_calls=llm_config.get('max_concurrent_calls', llm_config.get('concurrency', 8)),
+        timeout_s=llm_config.get('timeout_s', 120),
+        max_output_tokens=llm_config.get('max_output_tokens')
     )
 
 class LLM_Manager:
 
-    def __init__(self, base_cache_dir, model_name, temperature, system_prompt=None):
+    def __init__(self, base_cache_dir, model_name, temperature, system_prompt=None, max_concurrent_calls=8,
+                 timeout_s=120, max_output_tokens=None):
         self.model_name = model_name
         self.temperature = temperature
         self.system_prompt = system_prompt
 
+        # A hung request fails with DeadlineExceeded after timeout_s and is retried like other 5xx errors
+        self.request_options = {"timeout": timeout_s}
         generation_config = GenerationConfig(
             temperature=temperature,
+            max_output_tokens=max_output_tokens,  # None keeps the model's default
             response_mime_type="application/json"
             #,response_schema=list[] # FIXME
         )
@@ -41,19 +87,39 @@ class LLM_Manager:
         )
         self.cache_path = f"{base_cache_dir}/{model_name}/t{temperature}"
         self.disk_cache = Memory(self.cache_path, compress=3, verbose=0)
-        self.last_raw_response = None
+        # One manager is shared by all reconstruction threads: the raw response is kept per thread,
+        # and the limiter caps the requests in flight (slots are not held during retry back-off)
+        self._local = threading.local()
+        self._call_slots = _AIMDLimiter(max_concurrent_calls)
+        # API requests actually sent (disk-cache misses, plus their retries), logged per run to mlflow
+        self.stats = {'requests': 0}
+        self._stats_lock = threading.Lock()
         self.cached_call = self.disk_cache.cache(self._call_retry, ignore=['self'])
 
     @retry(
-        wait=wait_random_exponential(multiplier=2, min=60, max=60*5),
-        stop=stop_after_attempt(6),
-        retry=retry_if_exception_type((
-            google.api_core.exceptions.ResourceExhausted,  # For rate limits
-            google.api_core.exceptions.ServerError  # For all 5xx server issues
-        ))
+        # 5s, 10s, 20s, ... capped at 120s, plus up to 3s of jitter (works on both tenacity 8.x and 9.x)
+        wait=wait_exponential(multiplier=5, max=120) + wait_random(0, 3),
+        stop=stop_after_attempt(6) | stop_after_delay(10*60),
+        retry=retry_if_exception(_is_transient),
+        before_sleep=before_sleep_log(logging.getLogger(__name__), logging.WARNING),
+        reraise=True
     )
     def _invoke_llm(self, prompt):
-        return self.llm.generate_content(prompt)
+        # Only reached on a disk-cache miss; counted here since _call_retry's source must not change
+        # (joblib wipes a memoized function's cache when it does)
+        with self._stats_lock:
+            self.stats['requests'] += 1
+        with self._call_slots:
+            return self.llm.generate_content(prompt, request_options=self.request_options)
+
+    @property
+    def last_raw_response(self):
+        """The raw response of the calling thread's most recent uncached call."""
+        return getattr(self._local, 'raw_response', None)
+
+    @last_raw_response.setter
+    def last_raw_response(self, value):
+        self._local.raw_response = value
 
     def _call_retry(self, prompt):
         self.last_raw_response = None
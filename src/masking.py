@@ -15,14 +15,11 @@ class MaskingStrategy(ABC):
         pass
 
     def mask_list(self, captions:list[CaptionedClip], indices_to_mask:set):
-        masked_captions = []
-        for i, clip in enumerate(captions):
-            if i in indices_to_mask:
-                masked_clip = clip.model_copy()
-                masked_clip.data = DATA_MISSING
-                masked_captions.append(masked_clip)
-            else:
-                masked_captions.append(clip)
+        # Copy the list once and only touch the masked positions
+        masked_captions = list(captions)
+        for i in indices_to_mask:
+            if 0 <= i < len(captions):
+                masked_captions[i] = captions[i].model_copy(update={'data': DATA_MISSING})
         return masked_captions
 
     def apply(self, captions: list[CaptionedClip]) -> tuple[list[CaptionedClip], set]:
@@ -19,13 +19,9 @@ class Reconstructed(BaseModel):
         """
         Helper method to extract reference and candidate sentences.
         """
-        references = []
-        candidates = []
-
-        for i, c in self.reconstructed_clips.items():
-            candidates.append(c.data.caption)
-            references.append(orig_clips[i].data.caption)
-
+        clips = self.reconstructed_clips
+        candidates = [c.data.caption for c in clips.values()]
+        references = [orig_clips[i].data.caption for i in clips]
         return candidates, references
 
     def skip(self, reason: str):
@@ -63,29 +59,28 @@ class BaselineRepeatStrategy(ReconstructionStrategy):
         Fills masked clips by repeating the data from the last known clip.
         If initial clips are masked, it back-fills them with the first valid data.
         """
-        masked_clips = masked_video.clips
-
-        # First Pass: Find the first available data payload
-        first_valid_data = None
-        for clip in masked_clips:
-            if clip.data != DATA_MISSING:
-                first_valid_data = clip.data
-                break
-
-        # Second Pass: Reconstruct the transcript
         reconstructed_clips = {}
-        last_known_data = first_valid_data
+        last_known_data = None
+        # Masked clips seen before any valid data; back-filled once it shows up
+        pending = []
 
-        for i, clip in enumerate(masked_clips):
-            # new_clip = clip.model_copy()
+        for i, clip in enumerate(masked_video.clips):
             if clip.data != DATA_MISSING:
                 last_known_data = clip.data
-                # new_clip.data = clip.data
+                if pending:
+                    for j, masked_clip in pending:
+                        reconstructed_clips[j] = CaptionedClip.model_construct(timestamp=masked_clip.timestamp, data=last_known_data)
+                    pending = []
+            elif last_known_data is None:
+                pending.append((i, clip))
             else:
-                # Fill the masked clip with the last known data
-                new_clip = clip.model_copy(update={'data': last_known_data})
-                # new_clip.data = last_known_data
-                reconstructed_clips[i]=new_clip
+                # Fill the masked clip with the last known data. Inputs are already
+                # validated, so skip copying/validation and build the clip directly.
+                reconstructed_clips[i] = CaptionedClip.model_construct(timestamp=clip.timestamp, data=last_known_data)
+
+        # No valid data at all: keep the previous behaviour of filling with None
+        for j, masked_clip in pending:
+            reconstructed_clips[j] = CaptionedClip.model_construct(timestamp=masked_clip.timestamp, data=None)
 
         # return masked_video.model_copy(update={'clips': reconstructed_clips})
         return Reconstructed(video_id=masked_video.video_id, reconstructed_clips=reconstructed_clips)
@@ -10,7 +10,7 @@ from filelock import FileLock
 from masking import get_masking_strategies
 from evaluation import ReconstructionEvaluator
 from utils import check_git_repository_is_clean, object_to_dict, setup_logging, get_notification_logger, flush_loggers, \
-    setup_mlflow, get_datetime_str
+    setup_mlflow, get_datetime_str, log_jsonl_artifact
 from config_loader import load_config
 from reconstruction_strategies import ReconstructionStrategyBuilder
 from data_loaders import get_data_loader
@@ -18,6 +18,12 @@ from experiment_runner import ExperimentRunner
 from exceptions import UserFacingError
 
 
+# BERTScore model used when the config has no evaluation.model. Kept at the model all runs so far
+# were scored with; set the env var (e.g. to "distilroberta-base") for faster, non-comparable smoke runs.
+DEFAULT_SCORER_MODEL = 'microsoft/deberta-large-mnli'
+SCORER_MODEL_ENV = 'CAPTION_RECON_BERTSCORE_MODEL'
+
+
 def init():
     # --- 1. Pre-flight Checks and Setup ---
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -54,20 +60,27 @@ def main(config):
             os.environ["TRANSFORMERS_VERBOSITY"] = "error"
             logging.getLogger("transformers").setLevel(logging.ERROR)
 
-            # Log reproducibility parameters
-            mlflow.log_param("git_commit_hash", git_commit_hash)
-            mlflow.log_param("python_version", platform.python_version())
-            mlflow.log_param("mlflow_version", version('mlflow'))
+            # Log reproducibility parameters (one batched request to the tracking backend)
+            mlflow.log_params({
+                "git_commit_hash": git_commit_hash,
+                "python_version": platform.python_version(),
+                "mlflow_version": version('mlflow'),
+                "google_generativeai_version": version('google-generativeai')
+            })
 
             for runner, run_params in build_experiments(config):
                 run_name = runner.run_name
                 with mlflow.start_run(run_name=run_name, nested=True) as child_run:
                     logging.info(f"--- Starting Nested Run: {run_name} ---")
                     mlflow.log_params(run_params)
+                    llm_model = getattr(runner.reconstruction_strategy, 'llm_model', None)
+                    llm_stats_before = dict(llm_model.stats) if llm_model else None
                     metrics, all_recon_videos = runner.run()
 
                     mlflow.log_metrics(metrics)
-                    mlflow.log_text(text="\n".join(all_recon_videos), artifact_file='all_recon_videos.jsonl')
+                    if llm_model:
+                        mlflow.log_metrics({f"llm_{k}": v - llm_stats_before[k] for k, v in llm_model.stats.items()})
+                    log_jsonl_artifact(all_recon_videos, artifact_file='all_recon_videos.jsonl')
 
                     log_message = (f"{run_name} Logged aggregated metrics on"
                                    f" {metrics['num_of_instances']} instances."
@@ -83,11 +96,25 @@ def build_experiments(config):
     data_loader = get_data_loader(config["data_config"])
     # --- Loop 1: Reconstruction Strategy ---
     eval_conf = config.get('evaluation', {})
+    if eval_conf.get('compile_model', False):
+        # Persist compiled kernels next to the other caches so later runs skip most of the compile
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.abspath(os.path.join(config['paths']['joblib_cache'], 'torchinductor')))
 
     evaluator = ReconstructionEvaluator(
-        model_type=eval_conf.get('model', 'microsoft/deberta-large-mnli'),
+        model_type=eval_conf.get('model') or os.environ.get(SCORER_MODEL_ENV, DEFAULT_SCORER_MODEL),
         verbose=len(sys.argv) > 2 and sys.argv[2] == '--verbose',
-        idf=eval_conf.get('idf', True)
+        idf=eval_conf.get('idf', True),
+        batch_size=eval_conf.get('batch_size', 64),
+        device=eval_conf.get('device'),
+        half_precision=eval_conf.get('half_precision', False),
+        use_fast_tokenizer=eval_conf.get('use_fast_tokenizer', False),
+        compile_model=eval_conf.get('compile_model', False),
+        quantize_cpu=eval_conf.get('quantize_cpu', False),
+        # One evaluator scores every run below, so ground-truth captions recur across calls
+        embedding_cache_size=eval_conf.get('embedding_cache_size', 4096),
+        # Runs in a sweep often reproduce the same reconstructions (e.g. the baseline, or cached LLM replies)
+        score_cache_size=eval_conf.get('score_cache_size', 65536),
+        idf_cache_dir=os.path.join(config['paths']['joblib_cache'], 'idf')
     )
     evaluator.calc_idf(sents=data_loader.load_all_sentences())
 
@@ -115,7 +142,8 @@ def build_experiments(config):
                 data_loader=data_loader,
                 masking_strategy=masker,
                 reconstruction_strategy=recon_strategy,
-                evaluator=evaluator
+                evaluator=evaluator,
+                reconstruct_workers=config.get('llm', {}).get('concurrency', 8)
             )
             yield runner, run_conf
 
@@ -1,10 +1,13 @@
 # src/utils.py
 import os
+import subprocess
+import tempfile
 import mlflow
-import git
 from exceptions import UserFacingError
 import logging
 from datetime import datetime
+from functools import lru_cache
+from collections.abc import Iterable
 import pytz
 
 
@@ -105,16 +108,22 @@ def flush_loggers():
         handler.flush()
 
 
+@lru_cache(maxsize=1)
 def check_git_repository_is_clean():
-    """Checks for uncommitted changes and raises a specific error if dirty."""
+    """
+    Checks for uncommitted changes and raises a specific error if dirty.
+    A clean result (the HEAD sha) is memoized: the tree is checked once per process, not per run.
+    """
     logging.info("Performing Git repository cleanliness check...")
-    repo = git.Repo(search_parent_directories=True)
-    if repo.is_dirty(untracked_files=True):
+    # One porcelain status (tracked changes + untracked, non-ignored files) instead of GitPython's diff/status calls
+    status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=normal"],
+                            capture_output=True, text=True, check=True).stdout
+    if status.strip():
         error_message = "Git repository is dirty. Commit or stash changes before running."
         logging.error(error_message)
         raise UserFacingError(error_message)
     logging.info("Git repository is clean.")
-    return repo.head.object.hexsha
+    return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
 
 def setup_mlflow(
     experiment_name: str,
@@ -128,6 +137,18 @@ def setup_mlflow(
     mlflow.set_tracking_uri(tracking_uri)
     mlflow.set_experiment(experiment_name=experiment_name)
 
+def log_jsonl_artifact(lines: Iterable[str], artifact_file: str):
+    """
+    Logs the given lines as a JSONL artifact. The lines are written to a local file one at a
+    time (so a generator is never materialized) and uploaded once, instead of first being
+    joined into a second copy of the whole corpus.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, os.path.basename(artifact_file))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{line}\n" for line in lines)
+        mlflow.log_artifact(path, artifact_path=os.path.dirname(artifact_file) or None)
+
 def object_to_dict(obj: object) -> dict:
     """
     Recursively converts an object and its attributes into a dictionary
@@ -1,3 +1,4 @@
+import os
 import pytest
 from pathlib import Path
 import zipfile
@@ -70,3 +71,96 @@ def test_remote_backuper_backup_directory_as_zip(tmp_path: Path):
         zipped_files = zf.namelist()
         assert "file1.txt" in zipped_files
         assert "file2.txt" in zipped_files
+
+def test_remote_backuper_zip_keeps_nested_paths_and_no_local_copy(tmp_path: Path, monkeypatch):
+    """
+    Tests that nested directories are archived with relative names and that
+    the archive is written straight to the destination (nothing left in cwd).
+    """
+    # Arrange
+    source_dir = tmp_path / "source_mlruns"
+    dest_dir = tmp_path / "destination_zips"
+    work_dir = tmp_path / "cwd"
+    (source_dir / "run1" / "artifacts").mkdir(parents=True)
+    work_dir.mkdir()
+    (source_dir / "meta.yaml").write_text("meta")
+    (source_dir / "run1" / "artifacts" / "recon.jsonl").write_text("{}")
+    monkeypatch.chdir(work_dir)
+
+    backuper = RemoteBackuper(destination_dir=dest_dir, compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+
+    # Act
+    backuper.backup_directory_as_zip(source_dir=source_dir, archive_name_prefix="nested")
+
+    # Assert
+    zip_files = list(dest_dir.glob("nested_*.zip"))
+    assert len(zip_files) == 1
+    assert list(work_dir.iterdir()) == []
+    with zipfile.ZipFile(zip_files[0], 'r') as zf:
+        assert zf.read("run1/artifacts/recon.jsonl") == b"{}"
+        assert zf.read("meta.yaml") == b"meta"
+        assert zf.getinfo("meta.yaml").compress_type == zipfile.ZIP_DEFLATED
+
+def test_remote_backuper_backup_file_overwrites_larger_existing_file(tmp_path: Path):
+    """
+    Tests that copying over an existing, larger destination file truncates it.
+    """
+    # Arrange
+    source_file = tmp_path / "source" / "run.log"
+    dest_dir = tmp_path / "destination"
+    source_file.parent.mkdir()
+    dest_dir.mkdir()
+    payload = b"x" * ((1 << 20) + 17)
+    source_file.write_bytes(payload)
+    (dest_dir / "run.log").write_bytes(b"y" * (len(payload) + 100))
+
+    backuper = RemoteBackuper(destination_dir=dest_dir)
+
+    # Act
+    backuper.backup_file(source_file)
+
+    # Assert
+    assert (dest_dir / "run.log").read_bytes() == payload
+
+def test_remote_backuper_backup_file_already_in_destination_is_kept(tmp_path: Path):
+    """
+    Tests that backing up a file that already lives in the destination
+    directory leaves it intact instead of truncating it.
+    """
+    # Arrange
+    dest_dir = tmp_path / "destination"
+    dest_dir.mkdir()
+    existing = dest_dir / "run.log"
+    existing.write_text("keep me")
+
+    backuper = RemoteBackuper(destination_dir=dest_dir)
+
+    # Act
+    backuper.backup_file(existing)
+
+    # Assert
+    assert existing.read_text() == "keep me"
+
+def test_remote_backuper_zip_skips_dangling_symlinks_and_fifos(tmp_path: Path):
+    """
+    Tests that a dangling symlink or a FIFO in the tree is skipped instead of
+    aborting (or hanging) the whole archive.
+    """
+    # Arrange
+    source_dir = tmp_path / "source_mlruns"
+    dest_dir = tmp_path / "destination_zips"
+    source_dir.mkdir()
+    (source_dir / "meta.yaml").write_text("meta")
+    (source_dir / "dangling").symlink_to(tmp_path / "missing")
+    os.mkfifo(source_dir / "pipe")
+
+    backuper = RemoteBackuper(destination_dir=dest_dir)
+
+    # Act
+    backuper.backup_directory_as_zip(source_dir=source_dir, archive_name_prefix="links")
+
+    # Assert
+    zip_files = list(dest_dir.glob("links_*.zip"))
+    assert len(zip_files) == 1
+    with zipfile.ZipFile(zip_files[0], 'r') as zf:
+        assert zf.namelist() == ["meta.yaml"]
@@ -0,0 +1,102 @@
+import orjson
+import pytest
+import torch
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from check_recon import load_recon, do_eval_to_dataframe, build_evaluators
+from data_models import CaptionedClip, CaptionedVideo, NarrativeOnlyPayload, TimestampRange
+from reconstruction_strategies import Reconstructed
+
+
+@pytest.fixture
+def recon_jsonl(tmp_path: Path) -> Path:
+    """Writes a small all_recon_videos.jsonl in the same format ExperimentRunner produces."""
+    def recon(video_id: str, caption: str) -> str:
+        clip = CaptionedClip(timestamp=TimestampRange(start=0.0, end=1.0), data=NarrativeOnlyPayload(caption=caption))
+        return Reconstructed(video_id=video_id, reconstructed_clips={1: clip}).json_str()
+
+    path = tmp_path / "all_recon_videos.jsonl"
+    path.write_text("\n".join([recon("vid_a", "first"), recon("vid_b", "second"), recon("vid_c", "third")]))
+    return path
+
+
+def test_load_recon_by_index(recon_jsonl):
+    """🧪 Tests that a record is found by its 1-based line index."""
+    r, i = load_recon(recon_jsonl, index=2)
+
+    assert i == 2
+    assert r.video_id == "vid_b"
+    assert r.reconstructed_clips[1].data.caption == "second"
+
+
+def test_load_recon_by_video_id(recon_jsonl):
+    """🧪 Tests that a record is found by video_id, including on the last (unterminated) line."""
+    r, i = load_recon(recon_jsonl, video_id="vid_c")
+
+    assert i == 3
+    assert r.reconstructed_clips[1].data.caption == "third"
+
+
+def test_load_recon_not_found(recon_jsonl):
+    """🧪 Tests that missing (including non-positive) indices and ids raise."""
+    with pytest.raises(Exception, match='not found'):
+        load_recon(recon_jsonl, index=4)
+    with pytest.raises(Exception, match='not found'):
+        load_recon(recon_jsonl, index=0)
+    with pytest.raises(Exception, match='not found'):
+        load_recon(recon_jsonl, index=-1)
+    with pytest.raises(Exception, match='not found'):
+        load_recon(recon_jsonl, video_id="vid")
+
+
+def test_do_eval_to_dataframe_ranks_per_evaluator(tmp_path: Path, monkeypatch):
+    """🧪 Tests that scores are collected per evaluator and ranked within each one."""
+    original_video = CaptionedVideo(video_id="vid", clips=[
+        CaptionedClip(timestamp=TimestampRange(start=i, end=i + 1), data=NarrativeOnlyPayload(caption=f"orig {i}"))
+        for i in range(3)
+    ])
+    reconstructed = Reconstructed(video_id="vid", reconstructed_clips={
+        i: CaptionedClip(timestamp=TimestampRange(start=i, end=i + 1), data=NarrativeOnlyPayload(caption=f"recon {i}"))
+        for i in (0, 2)
+    })
+    evaluator_a = MagicMock()
+    evaluator_a.evaluate.return_value = {
+        "bs_f1": torch.tensor([0.2, 0.8]), "bs_p": torch.tensor([0.5, 0.4]), "bs_r": torch.tensor([0.1, 0.9])
+    }
+    evaluator_b = MagicMock()
+    evaluator_b.evaluate.return_value = {
+        "bs_f1": torch.tensor([0.7, 0.3]), "bs_p": torch.tensor([0.6, 0.6]), "bs_r": torch.tensor([0.3, 0.2])
+    }
+    monkeypatch.chdir(tmp_path)
+
+    key_a = ("model-a", False, False)
+    key_b = ("model-a", True, False)
+    df = do_eval_to_dataframe({key_a: lambda: evaluator_a, key_b: lambda: evaluator_b}, original_video, reconstructed)
+
+    assert df["eval_params"].tolist() == [key_a, key_a, key_b, key_b]
+    assert df["sent_ind"].tolist() == [0, 1, 0, 1]
+    assert df["orig_sent"].tolist() == ["orig 0", "orig 2", "orig 0", "orig 2"]
+    assert df["F1_rank"].tolist() == [1, 0, 0, 1]
+    assert df["P_rank"].tolist() == [0, 1, 0, 1]
+    assert df["F1"].round(3).tolist() == [0.2, 0.8, 0.7, 0.3]
+    exported = [orjson.loads(line) for line in (tmp_path / "vid.jsonl").read_bytes().splitlines()]
+    assert [r["eval_params"] for r in exported] == [list(key_a), list(key_a), list(key_b), list(key_b)]
+    assert [r["F1_rank"] for r in exported] == [1, 0, 0, 1]
+
+
+def test_build_evaluators_is_lazy(mocker):
+    """🧪 Tests that no scorer is constructed until an evaluator is requested, and then only once."""
+    mock_evaluator_cls = mocker.patch('check_recon.ReconstructionEvaluator')
+
+    evals = build_evaluators(["a sentence"])
+    assert len(evals) == 8
+    mock_evaluator_cls.assert_not_called()
+
+    key = ("roberta-large", True, False)
+    first = evals[key]()
+    second = evals[key]()
+
+    mock_evaluator_cls.assert_called_once_with(model_type="roberta-large", idf=True, rescale_with_baseline=False)
+    mock_evaluator_cls.return_value.calc_idf.assert_called_once_with(["a sentence"])
+    assert first is second
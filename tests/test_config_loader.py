@@ -0,0 +1,30 @@
+import os
+from pathlib import Path
+
+from config_loader import load_config
+
+
+def test_load_config_merges_and_rereads_modified_files(tmp_path: Path):
+    """
+    Tests that experiment values override system values, that callers can't
+    mutate the cached config, and that an edited file is picked up again.
+    """
+    # Arrange
+    system_path = tmp_path / "system.yaml"
+    experiment_path = tmp_path / "my_experiment.yaml"
+    system_path.write_text("tz: UTC\nlimit: 1\n")
+    experiment_path.write_text("limit: 5\n")
+
+    # Act
+    first = load_config(experiment_path, system_config_path=system_path)
+    first["limit"] = 999
+    second = load_config(experiment_path, system_config_path=system_path)
+
+    experiment_path.write_text("limit: 7\n")
+    stat = experiment_path.stat()
+    os.utime(experiment_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    third = load_config(experiment_path, system_config_path=system_path)
+
+    # Assert
+    assert second == {"tz": "UTC", "limit": 5, "__parent_run_name__": "my_experiment"}
+    assert third["limit"] == 7
@@ -71,6 +71,83 @@ def test_vatex_loader():
     assert videos[0].video_id == "video1"
     assert len(videos[0].clips) == 5 # Should only take the first 5 captions
 
+@pytest.mark.parametrize("loader", [
+    ToyDataLoader("datasets/toy_dataset/data.json"),
+    VideoStorytellingLoader("tests/fixtures/storytelling_mock"),
+    VatexLoader("tests/fixtures/vatex_mock/mock_data.json", limit=1),
+])
+def test_load_all_sentences_matches_loaded_captions(loader):
+    """
+    Tests that the model-free sentence readers return exactly the captions
+    of the fully loaded dataset, ignoring any configured limit.
+    """
+    # Act
+    sentences = loader.load_all_sentences()
+
+    # Assert
+    expected = [c.data.caption for v in loader.load(limit=10*1000*1000) for c in v.clips]
+    assert sentences == expected
+    assert len(sentences) > 0
+
+def test_load_is_cached_across_calls(mocker):
+    """
+    Tests that repeated loads reuse the first parse, that smaller limits are
+    served from the cache, and that callers get their own list.
+    """
+    # Arrange
+    loader = VatexLoader("tests/fixtures/vatex_mock/mock_data.json")
+    spy = mocker.spy(loader, "_load")
+
+    # Act
+    first = loader.load()
+    limited = loader.load(limit=1)
+    first.clear()
+    again = loader.load()
+
+    # Assert
+    assert spy.call_count == 1
+    assert [v.video_id for v in limited] == ["video1"]
+    assert [v.video_id for v in again] == ["video1", "video2"]
+
+    loader.reload()
+    loader.load()
+    assert spy.call_count == 2
+
+def test_find_by_video_id():
+    """
+    Tests that find returns the matching video, or None for unknown ids.
+    """
+    # Arrange
+    loader = VatexLoader("tests/fixtures/vatex_mock/mock_data.json")
+
+    # Act & Assert
+    assert loader.find("video2").video_id == "video2"
+    assert loader.find("missing") is None
+
+@pytest.mark.parametrize("loader_factory", [
+    lambda: ToyDataLoader("datasets/toy_dataset/data.json"),
+    lambda: VideoStorytellingLoader("tests/fixtures/storytelling_mock"),
+    lambda: VatexLoader("tests/fixtures/vatex_mock/mock_data.json", limit=1),
+])
+def test_load_iter_streams_full_dataset(loader_factory, mocker):
+    """
+    Tests that load_iter yields the same videos as a full load without going
+    through load(), and serves them from the cache once the dataset is loaded.
+    """
+    # Arrange
+    loader = loader_factory()
+    spy = mocker.spy(loader, "_load")
+
+    # Act
+    streamed = list(loader.load_iter())
+
+    # Assert
+    expected = loader.load(limit=10*1000*1000)
+    assert streamed == expected
+    assert spy.call_count == 1  # only the explicit load above
+    assert list(loader.load_iter()) == expected
+    assert spy.call_count == 1
+
 def test_get_data_loader_factory():
     """
     Tests that the factory function returns the correct loader instance
@@ -88,6 +165,31 @@ def test_get_data_loader_factory():
     # Assert
     assert isinstance(vatex_loader, VatexLoader)
     assert isinstance(story_loader, VideoStorytellingLoader)
+    assert story_loader.io_workers == 16
+    assert get_data_loader({**story_config, "io_workers": 4}).io_workers == 4
     with pytest.raises(NotImplementedError):
         get_data_loader(bad_config)
 
+
+
+@pytest.mark.parametrize("content, expected_captions", [
+    # non-ASCII / vertical whitespace between words is normalized to one space
+    ("vid\n0:01 0:02 a\xa0man\x0bwalks\x0cin\n", ["a man walks in"]),
+    # a bare '\r' ends a line, as it did when files were read in text mode
+    ("vid\r0:01 0:02 first clip\r0:02 0:03 second  clip\r\n0:03 0:04 third\tclip", ["first clip", "second clip", "third clip"]),
+])
+def test_video_storytelling_loader_normalizes_whitespace(tmp_path, content, expected_captions):
+    """
+    Tests that captions are split on any whitespace and joined with single
+    spaces, and that all newline conventions end a line.
+    """
+    # Arrange
+    (tmp_path / "vid.txt").write_bytes(content.encode("utf-8"))
+    loader = VideoStorytellingLoader(str(tmp_path))
+
+    # Act
+    video = loader.load()[0]
+
+    # Assert
+    assert [c.data.caption for c in video.clips] == expected_captions
+    assert list(loader.iter_sentences()) == expected_captions
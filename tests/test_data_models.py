@@ -1,5 +1,6 @@
 import pytest
-from data_models import CaptionedClip, NarrativeOnlyPayload, TimestampRange
+from pydantic import ValidationError
+from data_models import CaptionedClip, CaptionedVideo, NarrativeOnlyPayload, TimestampRange
 from reconstruction_strategies import Reconstructed
 
 # --- Test Data Fixture ---
@@ -104,3 +105,26 @@ def test_method_chaining(sample_clips):
     assert result.skip_reason == reason
     assert result.metrics == metrics
     assert result is recon
+
+def test_clips_are_immutable(sample_clips):
+    """🧪 Tests that loaded clips are frozen, so shared (cached) videos can't be mutated in place."""
+    orig_clips, _ = sample_clips
+
+    with pytest.raises(ValidationError):
+        orig_clips[0].data = "something else"
+
+    masked = orig_clips[0].model_copy(update={"data": "[DATA_MISSING]"})
+    assert masked.data == "[DATA_MISSING]"
+    assert orig_clips[0].data.caption == "The original first sentence."
+
+
+def test_to_columns(sample_clips):
+    """🧪 Tests that `to_columns` returns captions and timestamps as parallel columns."""
+    orig_clips, _ = sample_clips
+    video = CaptionedVideo(video_id="vid_001", clips=orig_clips)
+
+    columns = video.to_columns()
+
+    assert columns.captions == [c.data.caption for c in orig_clips]
+    assert columns.starts.tolist() == [0.0, 5.0, 10.0]
+    assert columns.ends.tolist() == [5.0, 10.0, 15.0]
@@ -3,7 +3,8 @@ import torch
 from unittest.mock import MagicMock, patch
 
 # Import the class and functions we are testing
-from evaluation import ReconstructionEvaluator, round_metrics, metrics_to_json
+import evaluation
+from evaluation import ReconstructionEvaluator, round_metrics, metrics_to_json, _load_bert_scorer
 
 from data_models import (
     CaptionedVideo,
@@ -26,6 +27,7 @@ def mock_bert_scorer(mocker):
     )
     # Patch the BERTScorer class in the evaluation module
     mocker.patch('evaluation.BERTScorer', return_value=scorer_instance)
+    _load_bert_scorer.cache_clear()
     return scorer_instance
 
 @pytest.fixture
@@ -106,4 +108,299 @@ def test_metrics_to_json():
     json_string = metrics_to_json(metrics)
 
     # Assert
-    assert json_string == '{"bs_f1": [0.85, 0.9], "num_clips": 2}'
+    assert json_string == '{"bs_f1":[0.85,0.9],"num_clips":2}'
+
+
+def test_evaluate_many_scores_once_and_splits_per_video(mock_bert_scorer, sample_data):
+    """
+    Tests that 'evaluate_many' makes a single BERTScore call for all videos
+    and slices the scores back per video (empty dict when nothing was reconstructed).
+    """
+    # Arrange
+    original_video, reconstructed_data = sample_data
+    single = MagicMock(spec=Reconstructed)
+    single.align.return_value = (["clip one recon"], ["clip one original"])
+    empty = MagicMock(spec=Reconstructed)
+    empty.align.return_value = ([], [])
+    mock_bert_scorer.score.return_value = (
+        torch.tensor([0.9, 0.95, 0.7]),
+        torch.tensor([0.8, 0.85, 0.6]),
+        torch.tensor([0.85, 0.9, 0.65]),
+    )
+    evaluator = ReconstructionEvaluator(model_type="mock-model")
+
+    # Act
+    results = evaluator.evaluate_many([
+        (reconstructed_data, original_video),
+        (empty, original_video),
+        (single, original_video),
+    ])
+
+    # Assert
+    mock_bert_scorer.score.assert_called_once()
+    call_kwargs = mock_bert_scorer.score.call_args.kwargs
+    assert call_kwargs['cands'] == ["clip two recon", "clip three recon", "clip one recon"]
+    assert call_kwargs['refs'] == ["clip two original", "clip three original", "clip one original"]
+    assert len(results) == 3
+    assert torch.equal(results[0]['bs_f1'], torch.tensor([0.85, 0.9]))
+    assert results[1] == {}
+    assert torch.equal(results[2]['bs_p'], torch.tensor([0.7]))
+
+
+def test_score_halves_batch_size_on_cuda_oom(mock_bert_scorer, sample_data):
+    """
+    Tests that a CUDA out-of-memory error makes the evaluator retry with half
+    the batch size, and that the smaller size is kept for later calls.
+    """
+    # Arrange
+    original_video, reconstructed_data = sample_data
+    scores = mock_bert_scorer.score.return_value
+    mock_bert_scorer.score.side_effect = [torch.cuda.OutOfMemoryError("oom"), scores]
+    evaluator = ReconstructionEvaluator(model_type="mock-model", batch_size=64)
+
+    # Act
+    metrics = evaluator.evaluate(reconstructed_data, original_video)
+
+    # Assert
+    assert [c.kwargs['batch_size'] for c in mock_bert_scorer.score.call_args_list] == [64, 32]
+    assert evaluator.batch_size == 32
+    assert torch.equal(metrics['bs_f1'], torch.tensor([0.85, 0.9]))
+
+
+@pytest.mark.parametrize("device, expected_cast", [("cpu", False), ("cuda:0", True)])
+def test_half_precision_only_casts_on_cuda(mock_bert_scorer, mocker, device, expected_cast):
+    """
+    Tests that half_precision casts the scorer model only when it lives on CUDA.
+    """
+    # Arrange
+    mock_bert_scorer.device = device
+    mocker.patch('evaluation.torch.cuda.is_bf16_supported', return_value=True)
+
+    # Act
+    ReconstructionEvaluator(model_type="mock-model", half_precision=True)
+
+    # Assert
+    if expected_cast:
+        mock_bert_scorer._model.to.assert_called_once_with(torch.bfloat16)
+    else:
+        mock_bert_scorer._model.to.assert_not_called()
+
+
+def test_evaluators_share_loaded_scorer_model(mocker):
+    """
+    Tests that evaluators for the same model load it only once, while each
+    keeps its own idf setting and idf dict.
+    """
+    # Arrange
+    scorer_cls = mocker.patch('evaluation.BERTScorer')
+    _load_bert_scorer.cache_clear()
+
+    # Act
+    plain = ReconstructionEvaluator(model_type="mock-model", idf=False)
+    weighted = ReconstructionEvaluator(model_type="mock-model", idf=True)
+    weighted.bert_scorer._idf_dict = {1: 0.5}
+
+    # Assert
+    scorer_cls.assert_called_once()
+    assert plain.bert_scorer._model is weighted.bert_scorer._model
+    assert (plain.bert_scorer._idf, weighted.bert_scorer._idf) == (False, True)
+    assert plain.bert_scorer._idf_dict != {1: 0.5}
+
+
+def test_compile_model_wraps_scorer_model(mock_bert_scorer, mocker):
+    """
+    Tests that compile_model replaces the scorer model with its torch.compile wrapper.
+    """
+    # Arrange
+    compiled = MagicMock()
+    compile_mock = mocker.patch('evaluation.torch.compile', return_value=compiled)
+    original_model = mock_bert_scorer._model
+
+    # Act
+    evaluator = ReconstructionEvaluator(model_type="mock-model", compile_model=True)
+
+    # Assert
+    compile_mock.assert_called_once_with(original_model, dynamic=True)
+    assert evaluator.bert_scorer._model is compiled
+
+
+@pytest.fixture
+def tiny_bert_scorer(tmp_path, mocker):
+    """
+    A real BERTScorer around a tiny, randomly initialised BERT (no download needed),
+    patched in as the scorer every ReconstructionEvaluator loads.
+    """
+    from bert_score import BERTScorer
+    from transformers import BertConfig, BertModel, BertTokenizer
+
+    words = "a the man woman dog cat walks runs sits in on park street house red blue".split()
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *words]))
+    torch.manual_seed(0)
+    model = BertModel(BertConfig(
+        vocab_size=5 + len(words), hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=37
+    )).eval()
+
+    # Bypass __init__, which would download the model from the hub
+    scorer = BERTScorer.__new__(BERTScorer)
+    scorer.__dict__.update(
+        device="cpu", _lang="en", _rescale_with_baseline=False, _idf=False, batch_size=64, nthreads=1,
+        all_layers=False, _model_type="tiny-bert", _num_layers=2, _use_fast_tokenizer=False,
+        _tokenizer=BertTokenizer(str(vocab_file), model_max_length=64), _model=model, _idf_dict=None, _baseline_vals=None,
+        baseline_path=None, use_custom_baseline=False,
+    )
+    mocker.patch('evaluation.BERTScorer', return_value=scorer)
+    _load_bert_scorer.cache_clear()
+    return scorer
+
+
+def _recon_pairs(recon_captions: list[str], orig_captions: list[str]) -> tuple[Reconstructed, CaptionedVideo]:
+    clips = [
+        CaptionedClip(timestamp=TimestampRange(start=i, end=i + 1), data=NarrativeOnlyPayload(caption=c))
+        for i, c in enumerate(orig_captions)
+    ]
+    reconstructed = Reconstructed(video_id="vid", reconstructed_clips={
+        i: CaptionedClip(timestamp=clips[i].timestamp, data=NarrativeOnlyPayload(caption=c))
+        for i, c in enumerate(recon_captions)
+    })
+    return reconstructed, CaptionedVideo(video_id="vid", clips=clips)
+
+
+@pytest.mark.parametrize("idf", [False, True])
+def test_embedding_cache_matches_bert_scorer_and_reuses_embeddings(tiny_bert_scorer, mocker, idf):
+    """
+    Tests that scoring through the embedding cache gives BERTScorer.score's numbers,
+    and that sentences seen in an earlier call are not encoded again.
+    """
+    # Arrange
+    first = _recon_pairs(["a man walks", "the red dog sits in the park"], ["a woman runs", "a dog sits"])
+    second = _recon_pairs(["a cat runs on the street"], ["a woman runs"])
+    corpus = ["a woman runs", "a dog sits", "the man walks in the park"]
+    direct = ReconstructionEvaluator(model_type="tiny-bert", idf=idf, batch_size=2)
+    cached = ReconstructionEvaluator(model_type="tiny-bert", idf=idf, batch_size=2, embedding_cache_size=100)
+    if idf:
+        direct.calc_idf(corpus)
+        cached.calc_idf(corpus)
+    encode_spy = mocker.spy(evaluation, "get_bert_embedding")
+
+    # Act
+    expected = direct.evaluate_many([first, second])
+    cached.evaluate(*first)
+    encode_spy.reset_mock()
+    actual = cached.evaluate_many([first, second])
+
+    # Assert
+    for exp, act in zip(expected, actual):
+        for key in ("bs_p", "bs_r", "bs_f1"):
+            assert torch.allclose(exp[key], act[key], atol=1e-5)
+    encoded = [s for call in encode_spy.call_args_list for s in call.args[0]]
+    assert encoded == ["a cat runs on the street"]
+
+
+def test_calc_idf_is_persisted_and_reloaded(tiny_bert_scorer, tmp_path, mocker):
+    """
+    Tests that calc_idf stores the IDF dict under idf_cache_dir and that another
+    evaluator reloads it (including the default for unseen tokens) without recomputing.
+    """
+    # Arrange
+    corpus = ["a woman runs", "a dog sits", "the man walks in the park"]
+    first = ReconstructionEvaluator(model_type="tiny-bert", idf_cache_dir=str(tmp_path))
+    second = ReconstructionEvaluator(model_type="tiny-bert", idf_cache_dir=str(tmp_path))
+
+    # Act
+    first.calc_idf(corpus)
+    compute_spy = mocker.spy(second.bert_scorer, "compute_idf")
+    second.calc_idf(corpus)
+
+    # Assert
+    compute_spy.assert_not_called()
+    assert len(list(tmp_path.glob("idf_*.pkl"))) == 1
+    assert dict(second.bert_scorer._idf_dict) == dict(first.bert_scorer._idf_dict)
+    assert second.bert_scorer._idf_dict[-1] == first.bert_scorer._idf_dict[-1]
+
+
+def test_identical_captions_are_not_scored(mock_bert_scorer, sample_data):
+    """
+    Tests that pairs whose candidate equals the reference get a perfect score
+    without being passed to BERTScore, while the other pairs keep their scores.
+    """
+    # Arrange
+    original_video, _ = sample_data
+    same = MagicMock(spec=Reconstructed)
+    same.align.return_value = (["same caption", "clip recon"], ["same caption", "clip original"])
+    mock_bert_scorer.score.return_value = (torch.tensor([0.5]), torch.tensor([0.6]), torch.tensor([0.55]))
+    evaluator = ReconstructionEvaluator(model_type="mock-model")
+
+    # Act
+    metrics = evaluator.evaluate(same, original_video)
+
+    # Assert
+    call_kwargs = mock_bert_scorer.score.call_args.kwargs
+    assert (call_kwargs['cands'], call_kwargs['refs']) == (["clip recon"], ["clip original"])
+    assert torch.equal(metrics['bs_p'], torch.tensor([1.0, 0.5]))
+    assert torch.equal(metrics['bs_f1'], torch.tensor([1.0, 0.55]))
+
+
+def test_duplicate_pairs_are_scored_once(mock_bert_scorer, sample_data):
+    """
+    Tests that a (candidate, reference) pair repeated across videos is passed to
+    BERTScore once and its scores are copied to every occurrence.
+    """
+    # Arrange
+    original_video, reconstructed_data = sample_data
+    mock_bert_scorer.score.return_value = (
+        torch.tensor([0.9, 0.95]), torch.tensor([0.8, 0.85]), torch.tensor([0.85, 0.9])
+    )
+    evaluator = ReconstructionEvaluator(model_type="mock-model")
+
+    # Act
+    first, second = evaluator.evaluate_many([(reconstructed_data, original_video)] * 2)
+
+    # Assert
+    call_kwargs = mock_bert_scorer.score.call_args.kwargs
+    assert call_kwargs['cands'] == ["clip two recon", "clip three recon"]
+    assert torch.equal(first['bs_f1'], torch.tensor([0.85, 0.9]))
+    assert torch.equal(second['bs_r'], torch.tensor([0.8, 0.85]))
+
+
+def test_quantize_cpu_uses_int8_linear_layers(tiny_bert_scorer):
+    """
+    Tests that quantize_cpu swaps the CPU scorer's Linear layers for dynamic int8
+    ones and that scores stay close to the full-precision model.
+    """
+    # Arrange
+    pair = _recon_pairs(["a man walks in the park", "the red dog sits"], ["a woman runs", "a dog sits"])
+    expected = ReconstructionEvaluator(model_type="tiny-bert").evaluate(*pair)
+    _load_bert_scorer.cache_clear()
+
+    # Act
+    evaluator = ReconstructionEvaluator(model_type="tiny-bert", quantize_cpu=True)
+    actual = evaluator.evaluate(*pair)
+
+    # Assert
+    assert not any(type(m) is torch.nn.Linear for m in evaluator.bert_scorer._model.modules())
+    assert torch.allclose(actual['bs_f1'], expected['bs_f1'], atol=0.05)
+
+
+def test_score_cache_skips_previously_scored_pairs(mock_bert_scorer, sample_data):
+    """
+    Tests that with a score cache, pairs scored by an earlier call reuse their
+    scores and only new pairs are passed to BERTScore.
+    """
+    # Arrange
+    original_video, reconstructed_data = sample_data
+    evaluator = ReconstructionEvaluator(model_type="mock-model", score_cache_size=16)
+    first = evaluator.evaluate(reconstructed_data, original_video)
+    partly_new, orig = _recon_pairs(["clip two recon", "something else"], ["clip two original", "another original"])
+    mock_bert_scorer.score.return_value = (torch.tensor([0.5]), torch.tensor([0.6]), torch.tensor([0.7]))
+
+    # Act
+    again = evaluator.evaluate(reconstructed_data, original_video)
+    mixed = evaluator.evaluate(partly_new, orig)
+
+    # Assert
+    assert mock_bert_scorer.score.call_count == 2
+    assert mock_bert_scorer.score.call_args.kwargs['cands'] == ["something else"]
+    for key in ("bs_p", "bs_r", "bs_f1"):
+        assert torch.equal(again[key], first[key])
+    assert torch.allclose(mixed['bs_f1'], torch.tensor([0.85, 0.7]))
@@ -0,0 +1,100 @@
+import json
+import threading
+import pytest
+import torch
+from unittest.mock import MagicMock
+
+from experiment_runner import ExperimentRunner
+from evaluation import ReconstructionEvaluator, _load_bert_scorer
+from masking import PartitionMasking
+from reconstruction_strategies import BaselineRepeatStrategy
+from data_models import CaptionedVideo, CaptionedClip, TimestampRange, NarrativeOnlyPayload
+
+
+def _video(video_id: str, num_clips: int) -> CaptionedVideo:
+    return CaptionedVideo(
+        video_id=video_id,
+        clips=[
+            CaptionedClip(timestamp=TimestampRange(start=i, end=i + 1), data=NarrativeOnlyPayload(caption=f"{video_id} clip {i}"))
+            for i in range(num_clips)
+        ]
+    )
+
+@pytest.fixture
+def mock_bert_scorer(mocker):
+    """A BERTScorer mock whose scores are the running index of each candidate."""
+    scorer_instance = MagicMock()
+
+    def score(cands, refs, batch_size):
+        scores = torch.arange(len(cands), dtype=torch.float32) / 10
+        return scores, scores, scores
+
+    scorer_instance.score.side_effect = score
+    mocker.patch('evaluation.BERTScorer', return_value=scorer_instance)
+    _load_bert_scorer.cache_clear()
+    return scorer_instance
+
+def test_run_scores_all_videos_in_one_batch(mock_bert_scorer):
+    """
+    Tests that run() evaluates every reconstructed video with a single BERTScore
+    call, and that the per-video records keep the input order (including skips).
+    """
+    # Arrange
+    data_loader = MagicMock()
+    data_loader.load.return_value = [_video("v1", 4), _video("tiny", 1), _video("v2", 4)]
+    runner = ExperimentRunner(
+        run_name="test",
+        data_loader=data_loader,
+        masking_strategy=PartitionMasking(num_partitions=2, start_partition=1, num_parts_to_mask=1),
+        reconstruction_strategy=BaselineRepeatStrategy(),
+        evaluator=ReconstructionEvaluator(model_type="mock-model")
+    )
+
+    # Act
+    agg_metrics, all_recon_videos = runner.run()
+
+    # Assert
+    mock_bert_scorer.score.assert_called_once()
+    assert mock_bert_scorer.score.call_args.kwargs['refs'] == ["v1 clip 2", "v1 clip 3", "v2 clip 2", "v2 clip 3"]
+
+    assert len(all_recon_videos) == 3
+    assert all_recon_videos[1] == "SKIP video.video_id='tiny' NOT_MASKING"
+    first, last = json.loads(all_recon_videos[0]), json.loads(all_recon_videos[2])
+    assert first["video_id"] == "v1" and first["metrics"]["bs_f1"] == pytest.approx([0.0, 0.1])
+    assert last["video_id"] == "v2" and last["metrics"]["bs_f1"] == pytest.approx([0.2, 0.3])
+
+    assert agg_metrics["num_of_instances"] == 2
+    # mean over videos of each video's minimum score
+    assert agg_metrics["mean_f1_score"] == pytest.approx((0.0 + 0.2) / 2)
+
+
+def test_run_reconstructs_videos_concurrently_in_order(mock_bert_scorer):
+    """
+    Tests that videos are reconstructed on a thread pool (both calls must be in
+    flight at once to pass the barrier) while the records keep the input order.
+    """
+    # Arrange
+    barrier = threading.Barrier(2, timeout=5)
+    baseline = BaselineRepeatStrategy()
+
+    class WaitingStrategy(BaselineRepeatStrategy):
+        def reconstruct(self, masked_video):
+            barrier.wait()
+            return baseline.reconstruct(masked_video)
+
+    data_loader = MagicMock()
+    data_loader.load.return_value = [_video("v1", 4), _video("v2", 4)]
+    runner = ExperimentRunner(
+        run_name="test",
+        data_loader=data_loader,
+        masking_strategy=PartitionMasking(num_partitions=2, start_partition=1, num_parts_to_mask=1),
+        reconstruction_strategy=WaitingStrategy(),
+        evaluator=ReconstructionEvaluator(model_type="mock-model"),
+        reconstruct_workers=2
+    )
+
+    # Act
+    _, all_recon_videos = runner.run()
+
+    # Assert
+    assert [json.loads(r)["video_id"] for r in all_recon_videos] == ["v1", "v2"]
@@ -0,0 +1,148 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+import google.api_core.exceptions
+
+from llm_interaction import LLM_Manager
+
+
+@pytest.fixture
+def mock_generative_model(mocker):
+    """A GenerativeModel mock whose responses echo the prompt."""
+    model_instance = MagicMock()
+    model_instance.generate_content.side_effect = lambda prompt, **kwargs: MagicMock(text=f"echo {prompt}")
+    mocker.patch('llm_interaction.genai.GenerativeModel', return_value=model_instance)
+    return model_instance
+
+def test_last_raw_response_is_per_thread(mock_generative_model, tmp_path):
+    """
+    Tests that threads sharing one manager each see their own last raw response.
+    """
+    # Arrange
+    manager = LLM_Manager(base_cache_dir=str(tmp_path), model_name="mock-model", temperature=0.0)
+    seen = {}
+
+    def call(prompt):
+        manager._call_retry(prompt)
+        seen[prompt] = manager.last_raw_response.text
+
+    # Act
+    threads = [threading.Thread(target=call, args=(p,)) for p in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Assert
+    assert seen == {"a": "echo a", "b": "echo b"}
+    assert manager.last_raw_response is None  # nothing was called on this thread
+
+def test_concurrent_calls_are_capped(mock_generative_model, tmp_path):
+    """
+    Tests that no more than max_concurrent_calls requests are in flight at once.
+    """
+    # Arrange
+    manager = LLM_Manager(base_cache_dir=str(tmp_path), model_name="mock-model", temperature=0.0, max_concurrent_calls=2)
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def generate_content(prompt, **kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return MagicMock(text=prompt)
+
+    mock_generative_model.generate_content.side_effect = generate_content
+
+    # Act
+    threads = [threading.Thread(target=manager._invoke_llm, args=(str(i),)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Assert
+    assert mock_generative_model.generate_content.call_count == 6
+    assert peak == 2
+
+def test_call_counts_only_requests_sent_to_the_api(mock_generative_model, tmp_path):
+    """
+    Tests that repeated prompts are served from the disk cache and that only
+    the requests actually sent to the API are counted.
+    """
+    # Arrange
+    manager = LLM_Manager(base_cache_dir=str(tmp_path), model_name="mock-model", temperature=0.0)
+
+    # Act
+    results = [manager.call(p) for p in ("a", "b", "a")]
+
+    # Assert
+    assert results == ["echo a", "echo b", "echo a"]
+    assert mock_generative_model.generate_content.call_count == 2
+    assert manager.stats == {'requests': 2}
+
+@pytest.mark.parametrize("error, expected_calls", [
+    (google.api_core.exceptions.ServiceUnavailable("overloaded"), 6),
+    (google.api_core.exceptions.ResourceExhausted("Quota exceeded for metric: requests per minute"), 6),
+    (google.api_core.exceptions.ResourceExhausted("Quota exceeded for metric: requests per day"), 1),
+    (google.api_core.exceptions.InvalidArgument("bad request"), 1),
+])
+def test_invoke_llm_retries_only_transient_errors(mock_generative_model, tmp_path, mocker, error, expected_calls):
+    """
+    Tests that 5xx errors and rate limits are retried, while daily quotas and
+    other 4xx errors fail fast with the original exception.
+    """
+    # Arrange
+    mocker.patch('time.sleep')
+    manager = LLM_Manager(base_cache_dir=str(tmp_path), model_name="mock-model", temperature=0.0)
+    mock_generative_model.generate_content.side_effect = error
+
+    # Act / Assert
+    with pytest.raises(type(error)):
+        manager._invoke_llm("prompt")
+    assert mock_generative_model.generate_content.call_count == expected_calls
+
+def test_rate_limits_halve_the_concurrency_cap(mock_generative_model, tmp_path, mocker):
+    """
+    Tests that a rate-limited request halves the concurrency cap and that
+    successful requests grow it back towards max_concurrent_calls.
+    """
+    # Arrange
+    mocker.patch('time.sleep')
+    manager = LLM_Manager(base_cache_dir=str(tmp_path), model_name="mock-model", temperature=0.0, max_concurrent_calls=8)
+    mock_generative_model.generate_content.side_effect = [
+        google.api_core.exceptions.ResourceExhausted("Quota exceeded for metric: requests per minute"),
+        MagicMock(text="ok"),
+        MagicMock(text="ok"),
+    ]
+
+    # Act
+    manager._invoke_llm("prompt")
+    limit_after_retry = manager._call_slots.limit
+    manager._invoke_llm("prompt")
+
+    # Assert
+    assert limit_after_retry == pytest.approx(4 + 1 / 4)
+    assert 4.25 < manager._call_slots.limit < 8
+
+def test_requests_are_sent_with_timeout_and_output_bound(mock_generative_model, tmp_path, mocker):
+    """
+    Tests that every request carries the configured timeout and that the
+    output-token bound is part of the model's generation config.
+    """
+    # Arrange
+    model_cls = mocker.patch('llm_interaction.genai.GenerativeModel', return_value=mock_generative_model)
+    manager = LLM_Manager(base_cache_dir=str(tmp_path), model_name="mock-model", temperature=0.0,
+                          timeout_s=30, max_output_tokens=2048)
+
+    # Act
+    manager._invoke_llm("prompt")
+
+    # Assert
+    assert mock_generative_model.generate_content.call_args.kwargs['request_options'] == {"timeout": 30}
+    assert model_cls.call_args.kwargs['generation_config'].max_output_tokens == 2048
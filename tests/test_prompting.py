@@ -0,0 +1,26 @@
+import json
+import pytest
+
+from prompting import JSONPromptBuilder
+from data_models import CaptionedVideo, CaptionedClip, TimestampRange, NarrativeOnlyPayload, DATA_MISSING
+
+
+@pytest.mark.parametrize("caption", ["a man opens the door", "un café près de la fenêtre"])
+def test_build_prompt_matches_json_dumps(caption):
+    """
+    Tests that the prompt is byte-identical to the json.dumps(indent=2) form,
+    so prompts (and their LLM cache entries) are unchanged, including non-ASCII captions.
+    """
+    # Arrange
+    builder = JSONPromptBuilder.from_string("Fill in {DATA_MISSING}.")
+    video = CaptionedVideo(video_id="v", clips=[
+        CaptionedClip(timestamp=TimestampRange(start=0.0, end=1.5), data=NarrativeOnlyPayload(caption=caption)),
+        CaptionedClip(timestamp=TimestampRange(start=1.5, end=3.0), data=DATA_MISSING),
+    ])
+    expected_json = json.dumps([clip.model_dump() for clip in video.clips], indent=2)
+
+    # Act
+    prompt = builder.build_prompt(video)
+
+    # Assert
+    assert prompt == f"Fill in {DATA_MISSING}.\n\n{expected_json}"
@@ -55,6 +55,32 @@ def test_baseline_strategy_handles_initial_mask():
     assert r.reconstructed_clips[0].data.caption == "second"
 
 
+def test_baseline_strategy_backfills_leading_masks_in_order():
+    """
+    Tests that several leading masked clips are back-filled with the first
+    valid data and that the reconstructed clips keep their original order.
+    """
+    # Arrange
+    masked_video = CaptionedVideo(
+        video_id="test_video_leading_masks",
+        clips=[
+            CaptionedClip(timestamp=TimestampRange(start=0.0, end=1.0), data=DATA_MISSING),
+            CaptionedClip(timestamp=TimestampRange(start=1.0, end=2.0), data=DATA_MISSING),
+            CaptionedClip(timestamp=TimestampRange(start=2.0, end=3.0), data=NarrativeOnlyPayload(caption="third")),
+            CaptionedClip(timestamp=TimestampRange(start=3.0, end=4.0), data=DATA_MISSING),
+        ]
+    )
+    baseline_strategy = BaselineRepeatStrategy()
+
+    # Act
+    r = baseline_strategy.reconstruct(masked_video)
+
+    # Assert
+    assert list(r.reconstructed_clips.keys()) == [0, 1, 3]
+    assert [c.data.caption for c in r.reconstructed_clips.values()] == ["third"] * 3
+    assert r.reconstructed_clips[1].timestamp.start == 1.0
+
+
 # --- Test for LLMStrategy ---
 
 @patch('reconstruction_strategies.parse_llm_response')